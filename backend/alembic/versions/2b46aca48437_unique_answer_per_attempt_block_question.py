@@ -0,0 +1,52 @@
+"""unique answer per (attempt, block, question)
+
+Revision ID: 2b46aca48437
+Revises: a826fe73807c
+Create Date: 2026-10-18 10:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b46aca48437'
+down_revision: Union[str, None] = 'a826fe73807c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Дублікати з'явились через read-then-write у submit_answer:
+    # лишаємо найновіший рядок (найбільший id) для кожного ключа.
+    op.execute(
+        """
+        DELETE FROM answers a
+        USING answers b
+        WHERE a.attempt_id = b.attempt_id
+          AND a.block_id = b.block_id
+          AND a.question_id IS NOT DISTINCT FROM b.question_id
+          AND a.id < b.id
+        """
+    )
+    op.create_index(
+        'uq_answers_attempt_block_question',
+        'answers',
+        ['attempt_id', 'block_id', 'question_id'],
+        unique=True,
+        postgresql_where=sa.text('question_id IS NOT NULL'),
+    )
+    op.create_index(
+        'uq_answers_attempt_block_no_question',
+        'answers',
+        ['attempt_id', 'block_id'],
+        unique=True,
+        postgresql_where=sa.text('question_id IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_answers_attempt_block_no_question', table_name='answers')
+    op.drop_index('uq_answers_attempt_block_question', table_name='answers')
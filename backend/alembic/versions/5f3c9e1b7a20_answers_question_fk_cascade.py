@@ -0,0 +1,34 @@
+"""answers.question_id FK on delete cascade
+
+Revision ID: 5f3c9e1b7a20
+Revises: d41f7a9c2e06
+Create Date: 2026-10-18 18:05:12.408113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f3c9e1b7a20'
+down_revision: Union[str, None] = 'd41f7a9c2e06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SET NULL порушував uq_answers_attempt_block_no_question, якщо в блоці вже є відповідь без питання
+    op.drop_constraint('answers_question_id_fkey', 'answers', type_='foreignkey')
+    op.create_foreign_key(
+        'answers_question_id_fkey', 'answers', 'questions',
+        ['question_id'], ['id'], ondelete='CASCADE',
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('answers_question_id_fkey', 'answers', type_='foreignkey')
+    op.create_foreign_key(
+        'answers_question_id_fkey', 'answers', 'questions',
+        ['question_id'], ['id'], ondelete='SET NULL',
+    )
@@ -0,0 +1,66 @@
+"""jsonb for blocks.config and questions.options
+
+Revision ID: 6c2721969ecb
+Revises: b5eba04f83ff
+Create Date: 2026-10-18 11:47:52.318906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c2721969ecb'
+down_revision: Union[str, None] = 'b5eba04f83ff'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Тимчасова функція: битий JSON-текст -> NULL (як це робив parse_json), а не падіння міграції
+    op.execute(
+        """
+        CREATE FUNCTION _try_jsonb(value text) RETURNS jsonb AS $$
+        BEGIN
+            IF value IS NULL OR btrim(value) = '' THEN
+                RETURN NULL;
+            END IF;
+            RETURN NULLIF(value::jsonb, 'null'::jsonb);
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql IMMUTABLE
+        """
+    )
+    op.alter_column('blocks', 'config',
+               existing_type=sa.Text(),
+               type_=postgresql.JSONB(),
+               postgresql_using='_try_jsonb(config)',
+               existing_nullable=True)
+    op.alter_column('questions', 'options',
+               existing_type=sa.Text(),
+               type_=postgresql.JSONB(),
+               postgresql_using='_try_jsonb(options)',
+               existing_nullable=True)
+    op.execute('DROP FUNCTION _try_jsonb(text)')
+
+    op.create_index('ix_blocks_config_gin', 'blocks', ['config'], unique=False, postgresql_using='gin')
+    op.create_index('ix_questions_options_gin', 'questions', ['options'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_questions_options_gin', table_name='questions', postgresql_using='gin')
+    op.drop_index('ix_blocks_config_gin', table_name='blocks', postgresql_using='gin')
+    op.alter_column('questions', 'options',
+               existing_type=postgresql.JSONB(),
+               type_=sa.Text(),
+               postgresql_using='options::text',
+               existing_nullable=True)
+    op.alter_column('blocks', 'config',
+               existing_type=postgresql.JSONB(),
+               type_=sa.Text(),
+               postgresql_using='config::text',
+               existing_nullable=True)
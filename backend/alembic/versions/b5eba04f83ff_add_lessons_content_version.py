@@ -0,0 +1,29 @@
+"""add lessons.content_version
+
+Revision ID: b5eba04f83ff
+Revises: 2b46aca48437
+Create Date: 2026-10-18 11:03:17.845290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5eba04f83ff'
+down_revision: Union[str, None] = '2b46aca48437'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'lessons',
+        sa.Column('content_version', sa.Integer(), server_default='1', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('lessons', 'content_version')
@@ -0,0 +1,79 @@
+"""foreign-key and hot-filter indexes
+
+Revision ID: ca5c741a558c
+Revises: 6c2721969ecb
+Create Date: 2026-10-18 12:26:09.771432
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ca5c741a558c'
+down_revision: Union[str, None] = '6c2721969ecb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (назва, таблиця, колонки) — мають збігатися з Index/index=True у моделях
+INDEXES = [
+    # гарячі фільтри
+    ('ix_lesson_attempts_student_started', 'lesson_attempts', ['student_id', 'started_at']),
+    ('ix_lesson_attempts_lesson_student_status', 'lesson_attempts', ['lesson_id', 'student_id', 'status']),
+    ('ix_answers_attempt_id', 'answers', ['attempt_id']),
+    ('ix_blocks_section_order', 'blocks', ['section_id', 'order']),
+    ('ix_sections_lesson_order', 'sections', ['lesson_id', 'order']),
+    ('ix_questions_block_order', 'questions', ['block_id', 'order']),
+    ('ix_chat_messages_chat_sent', 'chat_messages', ['chat_id', 'sent_at']),
+    ('ix_call_participants_call_user', 'call_participants', ['call_id', 'user_id']),
+    ('ix_classrooms_teacher_id', 'classrooms', ['teacher_id']),
+    ('ix_task_results_task_student', 'task_results', ['task_id', 'student_id']),
+    # решта FK (каскадні видалення / джойни без seq scan)
+    ('ix_lessons_created_by', 'lessons', ['created_by']),
+    ('ix_classrooms_student_id', 'classrooms', ['student_id']),
+    ('ix_classrooms_current_lesson_id', 'classrooms', ['current_lesson_id']),
+    ('ix_calls_classroom_id', 'calls', ['classroom_id']),
+    ('ix_chats_classroom_id', 'chats', ['classroom_id']),
+    ('ix_classroom_progress_classroom_id', 'classroom_progress', ['classroom_id']),
+    ('ix_classroom_progress_student_id', 'classroom_progress', ['student_id']),
+    ('ix_universal_tasks_lesson_id', 'universal_tasks', ['lesson_id']),
+    ('ix_universal_tasks_created_by', 'universal_tasks', ['created_by']),
+    ('ix_universal_tasks_classroom_id', 'universal_tasks', ['classroom_id']),
+    ('ix_call_participants_user_id', 'call_participants', ['user_id']),
+    ('ix_chat_messages_user_id', 'chat_messages', ['user_id']),
+    ('ix_classroom_tasks_classroom_id', 'classroom_tasks', ['classroom_id']),
+    ('ix_classroom_tasks_task_id', 'classroom_tasks', ['task_id']),
+    ('ix_classroom_tasks_assigned_by', 'classroom_tasks', ['assigned_by']),
+    ('ix_questions_task_id', 'questions', ['task_id']),
+    ('ix_answers_block_id', 'answers', ['block_id']),
+    ('ix_answers_question_id', 'answers', ['question_id']),
+    ('ix_task_results_student_id', 'task_results', ['student_id']),
+    ('ix_task_results_question_id', 'task_results', ['question_id']),
+    ('ix_ai_feedback_task_result_id', 'ai_feedback', ['task_result_id']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY не працює всередині транзакції; IF NOT EXISTS — щоб перезапуск
+    # після обірваної міграції не падав на вже створених індексах
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
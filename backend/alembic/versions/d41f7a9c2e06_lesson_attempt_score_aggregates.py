@@ -0,0 +1,114 @@
+"""lesson_attempts score aggregates
+
+Revision ID: d41f7a9c2e06
+Revises: ca5c741a558c
+Create Date: 2026-10-18 13:21:05.614377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.utils import grading
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f7a9c2e06'
+down_revision: Union[str, None] = 'ca5c741a558c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('lesson_attempts', sa.Column('auto_score', sa.Float(), nullable=True))
+    op.add_column('lesson_attempts', sa.Column('max_auto_score', sa.Float(), nullable=True))
+    op.add_column('lesson_attempts', sa.Column('answered_count', sa.Integer(), nullable=True))
+    op.add_column('lesson_attempts', sa.Column('section_scores', postgresql.JSONB(), nullable=True))
+    op.add_column('lesson_attempts', sa.Column('time_spent_seconds', sa.Integer(), nullable=True))
+
+    # Бекфіл уже завершених спроб — той самий агрегат, що й app/utils/attempt_score.py.
+    # Автоперевірювані питання — ті, для яких реєстр грейдерів компілює ключ (як у answer_key).
+    bind = op.get_bind()
+    questions = bind.execute(
+        sa.text(
+            """
+            SELECT q.id, b.task_type, b.config, q.correct_answer, q.options
+            FROM questions q
+            JOIN blocks b ON b.id = q.block_id
+            """
+        ).columns(config=postgresql.JSONB(), options=postgresql.JSONB())
+    ).all()
+    auto_ids = [
+        question_id
+        for question_id, task_type, config, correct_answer, options in questions
+        if grading.compile_key(task_type, correct_answer, options, config) is not None
+    ]
+    bind.execute(
+        sa.text(
+            """
+            WITH slots AS (
+                SELECT la.id AS attempt_id, b.section_id,
+                       q.id = ANY(:auto_ids) AS auto,
+                       a.id AS answer_id, a.bot_score
+                FROM lesson_attempts la
+                JOIN sections s ON s.lesson_id = la.lesson_id
+                JOIN blocks b ON b.section_id = s.id
+                JOIN questions q ON q.block_id = b.id
+                LEFT JOIN answers a ON a.question_id = q.id AND a.attempt_id = la.id
+                WHERE la.status = 'completed'
+                UNION ALL
+                SELECT a.attempt_id, b.section_id, false, a.id, a.bot_score
+                FROM answers a
+                JOIN blocks b ON b.id = a.block_id
+                JOIN lesson_attempts la ON la.id = a.attempt_id
+                WHERE a.question_id IS NULL AND la.status = 'completed'
+            ),
+            per_section AS (
+                SELECT attempt_id, section_id,
+                       coalesce(sum(bot_score), 0.0) AS score,
+                       count(*) FILTER (WHERE auto) AS max_score,
+                       count(answer_id) AS answered
+                FROM slots
+                GROUP BY attempt_id, section_id
+            ),
+            per_attempt AS (
+                SELECT attempt_id,
+                       sum(score) AS auto_score,
+                       sum(max_score) AS max_auto_score,
+                       sum(answered) AS answered_count,
+                       jsonb_agg(
+                           jsonb_build_object(
+                               'section_id', section_id, 'score', score,
+                               'max_score', max_score, 'answered', answered
+                           ) ORDER BY section_id
+                       ) AS section_scores
+                FROM per_section
+                GROUP BY attempt_id
+            )
+            UPDATE lesson_attempts la
+            SET auto_score = p.auto_score,
+                max_auto_score = p.max_auto_score,
+                answered_count = p.answered_count,
+                section_scores = p.section_scores
+            FROM per_attempt p
+            WHERE la.id = p.attempt_id
+            """
+        ).bindparams(sa.bindparam("auto_ids", auto_ids, type_=postgresql.ARRAY(sa.Integer())))
+    )
+    op.execute(
+        """
+        UPDATE lesson_attempts
+        SET time_spent_seconds = greatest(extract(epoch FROM completed_at - started_at), 0)::int
+        WHERE status = 'completed' AND completed_at IS NOT NULL AND started_at IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('lesson_attempts', 'time_spent_seconds')
+    op.drop_column('lesson_attempts', 'section_scores')
+    op.drop_column('lesson_attempts', 'answered_count')
+    op.drop_column('lesson_attempts', 'max_auto_score')
+    op.drop_column('lesson_attempts', 'auto_score')
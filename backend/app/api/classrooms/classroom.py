@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List
-from app.core.database import get_async_session
+from app.core.database import get_async_session, get_read_session
 from app.models.classrooms.classroom import Classroom
 from app.models.users.users import User
 from app.schemas.classrooms.classroom import ClassroomCreate, ClassroomResponse, ClassroomUpdate
@@ -44,7 +44,7 @@ async def create_classroom(
 
 @router.get("/", response_model=List[ClassroomResponse])
 async def classrooms_list(
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(current_active_user),
 ):
     """Отримує список усіх класів без кешу."""
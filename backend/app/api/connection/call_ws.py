@@ -1,17 +1,21 @@
-from fastapi import WebSocket, WebSocketDisconnect, APIRouter, Depends, HTTPException, Query
-from fastapi.websockets import WebSocketState
-from jose import jwt, JWTError
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import WebSocket, WebSocketDisconnect, APIRouter, Query
+from sqlalchemy import update
 from sqlalchemy.future import select
 from sqlalchemy.sql import func
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
-from app.core.config import settings
-from app.core.database import get_async_session
+from app.api.connection.ws_auth import WSAuthError, authenticate_ws
+from app.core.database import async_session_maker
 from app.models.connection.call import Call, CallParticipant
-from app.models.users.users import User, Status
-from app.core.cache import get_cache, set_cache
+from app.core.cache import get_cache, set_cache, redis_client
+from app.core.broker import Broker, broker as default_broker
+from app.core import ws_frame
+from app.core.ws_outbox import DISCONNECT, Outbox
+import asyncio
+import functools
 import logging
+import time
+import uuid
 
 router = APIRouter(prefix="/ws/calls", tags=["WebSocket Calls"])
 logger = logging.getLogger("websocket_calls")
@@ -28,33 +32,18 @@ class WebSocketAction(BaseModel):
 def create_message(action: str, user_id: int, **kwargs) -> Dict[str, Any]:
     return {"action": action, "user": user_id, **kwargs}
 
-async def get_user_from_token(token: str, db: AsyncSession) -> User:
-    try:
-        payload = jwt.decode(
-            token,
-            settings.secret_key,
-            algorithms=[settings.algorithm],
-            options={"verify_aud": False},
-        )
-        user_id = int(payload.get("sub"))
-        user = await db.get(User, user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        return user
-    except JWTError:
-        raise HTTPException(status_code=403, detail="Invalid token")
-
-async def get_cached_participant_status(call_id: int, user_id: int, db: AsyncSession):
+async def get_cached_participant_status(call_id: int, user_id: int):
     cache_key = f"call:{call_id}:participant:{user_id}"
     status = await get_cache(cache_key)
     if not status:
-        result = await db.execute(
-            select(CallParticipant).filter(
-                CallParticipant.call_id == call_id,
-                CallParticipant.user_id == user_id
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(CallParticipant).filter(
+                    CallParticipant.call_id == call_id,
+                    CallParticipant.user_id == user_id
+                )
             )
-        )
-        participant = result.scalars().first()
+            participant = result.scalars().first()
         if not participant:
             # створимо дефолт — не блокуємо WS
             status = {
@@ -79,53 +68,207 @@ async def update_cached_participant_status(call_id: int, user_id: int, updates:
     status.update({k: v for k, v in updates.items() if v is not None})
     await set_cache(cache_key, status, ttl=1800)
 
+PRESENCE_TTL = 30          # сек; учасник «живий», поки його воркер оновлює мітку
+HEARTBEAT_INTERVAL = 10
+
+
 class ConnectionManager:
-    def __init__(self):
-        # active_connections[call_id][user_id] = WebSocket
+    """Сигналінг дзвінків між воркерами.
+
+    Сокети — лише локальні (active_connections). Хто в дзвінку, знає Redis:
+    хеш call:{id}:presence, поле user_id -> "conn_id:expires_at"; мітки оновлює heartbeat
+    воркера, що тримає сокет. Доставка — через брокер:
+      call-ws:{call_id}               — broadcast усім учасникам дзвінка;
+      call-ws:{call_id}:user:{uid}    — особисті повідомлення (offer/answer/ice) і витіснення
+                                        старого сокета, якщо користувач перепідключився деінде.
+    """
+
+    def __init__(self, broker: Broker = default_broker, redis=redis_client):
+        self.broker = broker
+        self.redis = redis
+        # active_connections[call_id][user_id] = WebSocket (лише цей воркер)
         self.active_connections: Dict[int, Dict[int, WebSocket]] = {}
+        self._conn_ids: Dict[tuple[int, int], str] = {}
+        # черга відправки на сокет; відстаючого клієнта відключаємо — пропуск offer/ice ламає зʼєднання
+        self._outboxes: Dict[tuple[int, int], Outbox] = {}
+        self._handlers: Dict[str, Any] = {}
+        self._heartbeat: asyncio.Task | None = None
+
+    # ---------- ключі й канали ----------
+    @staticmethod
+    def _presence_key(call_id: int) -> str:
+        return f"call:{call_id}:presence"
+
+    @staticmethod
+    def _call_channel(call_id: int) -> str:
+        return f"call-ws:{call_id}"
+
+    @staticmethod
+    def _user_channel(call_id: int, user_id: int) -> str:
+        return f"call-ws:{call_id}:user:{user_id}"
+
+    # ---------- присутність ----------
+    async def _touch(self, pairs) -> None:
+        expires = int(time.time()) + PRESENCE_TTL
+        pipe = self.redis.pipeline()
+        for call_id, user_id in pairs:
+            conn_id = self._conn_ids.get((call_id, user_id))
+            if conn_id is None:
+                continue
+            pipe.hset(self._presence_key(call_id), str(user_id), f"{conn_id}:{expires}")
+            pipe.expire(self._presence_key(call_id), PRESENCE_TTL * 2)
+        await pipe.execute()
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            try:
+                await self._touch(list(self._conn_ids))
+            except Exception as e:
+                logger.warning(f"[WS PRESENCE] heartbeat failed: {e}")
+
+    async def list_peers(self, call_id: int, exclude_user_id: Optional[int] = None) -> List[int]:
+        """Учасники дзвінка на всіх воркерах (протухлі мітки прибираємо)."""
+        now = int(time.time())
+        peers, stale = [], []
+        for field, value in (await self.redis.hgetall(self._presence_key(call_id))).items():
+            _, _, expires = value.rpartition(":")
+            if int(expires or 0) < now:
+                stale.append(field)
+            else:
+                peers.append(int(field))
+        if stale:
+            await self.redis.hdel(self._presence_key(call_id), *stale)
+        return [p for p in sorted(peers) if p != exclude_user_id]
+
+    # ---------- підписки ----------
+    async def _subscribe(self, channel: str, handler) -> None:
+        self._handlers[channel] = handler
+        await self.broker.subscribe(channel, handler)
+
+    async def _unsubscribe(self, channel: str) -> None:
+        handler = self._handlers.pop(channel, None)
+        if handler is not None:
+            await self.broker.unsubscribe(channel, handler)
 
-    def list_peers(self, call_id: int, exclude_user_id: Optional[int] = None) -> List[int]:
-        peers = list(self.active_connections.get(call_id, {}).keys())
-        return [p for p in peers if p != exclude_user_id]
+    async def _on_call_message(self, call_id: int, raw: str) -> None:
+        header, text = ws_frame.unpack(raw)
+        exclude = header.get("exclude")
+        for uid in self.active_connections.get(call_id, {}):
+            if exclude is None or uid != exclude:
+                self._send_local(call_id, uid, text)
 
+    async def _on_user_message(self, call_id: int, user_id: int, raw: str) -> None:
+        header, text = ws_frame.unpack(raw)
+        ws = self.active_connections.get(call_id, {}).get(user_id)
+        if ws is None:
+            return
+        takeover = header.get("takeover")
+        if takeover is not None:
+            # користувач зайшов з іншого сокета (можливо, на іншому воркері) — старий закриваємо
+            if takeover != self._conn_ids.get((call_id, user_id)):
+                try:
+                    await ws.close()
+                except Exception as e:
+                    logger.warning(f"[WS ERROR] closing previous WS of user {user_id}: {e}")
+                if self.disconnect_local(call_id, user_id, ws):
+                    await self._drop(call_id, user_id)
+            return
+        self._send_local(call_id, user_id, text)
+
+    def _send_local(self, call_id: int, user_id: int, text: str) -> None:
+        out = self._outboxes.get((call_id, user_id))
+        if out is not None:
+            out.send(text)
+
+    # ---------- життєвий цикл зʼєднання ----------
     async def connect(self, call_id: int, user_id: int, websocket: WebSocket):
         await websocket.accept()
-        if call_id not in self.active_connections:
-            self.active_connections[call_id] = {}
+        local = self.active_connections.setdefault(call_id, {})
 
-        if user_id in self.active_connections[call_id]:
+        previous = local.get(user_id)
+        if previous is not None:
+            await self._outboxes.pop((call_id, user_id)).close()
             try:
-                await self.active_connections[call_id][user_id].close()
+                await previous.close()
             except Exception as e:
                 logger.warning(f"[WS ERROR] closing previous WS of user {user_id}: {e}")
 
-        self.active_connections[call_id][user_id] = websocket
+        conn_id = uuid.uuid4().hex
+        local[user_id] = websocket
+        self._conn_ids[(call_id, user_id)] = conn_id
+        self._outboxes[(call_id, user_id)] = Outbox(websocket, "call", policy=DISCONNECT)
+
+        call_channel = self._call_channel(call_id)
+        if call_channel not in self._handlers:
+            await self._subscribe(call_channel, functools.partial(self._on_call_message, call_id))
+        # спершу витісняємо старі сокети на інших воркерах, потім слухаємо свій канал
+        await self.broker.publish(
+            self._user_channel(call_id, user_id), ws_frame.pack({"takeover": conn_id}, "")
+        )
+        user_channel = self._user_channel(call_id, user_id)
+        if user_channel not in self._handlers:
+            await self._subscribe(
+                user_channel, functools.partial(self._on_user_message, call_id, user_id)
+            )
+
+        await self._touch([(call_id, user_id)])
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
         logger.info(f"[WS CONNECT] User {user_id} joined call {call_id}")
 
-    def disconnect(self, call_id: int, user_id: int):
-        if call_id in self.active_connections:
-            self.active_connections[call_id].pop(user_id, None)
-            if not self.active_connections[call_id]:
-                self.active_connections.pop(call_id)
-            logger.info(f"[WS DISCONNECT] User {user_id} disconnected from call {call_id}")
+    def disconnect_local(self, call_id: int, user_id: int, websocket: WebSocket) -> bool:
+        """Прибирає сокет із локального реєстру, якщо він досі актуальний для користувача."""
+        local = self.active_connections.get(call_id)
+        if not local or local.get(user_id) is not websocket:
+            return False
+        local.pop(user_id, None)
+        if not local:
+            self.active_connections.pop(call_id, None)
+        return True
+
+    async def _drop(self, call_id: int, user_id: int) -> str | None:
+        """Забуває локального учасника: conn_id і підписки брокера."""
+        conn_id = self._conn_ids.pop((call_id, user_id), None)
+        out = self._outboxes.pop((call_id, user_id), None)
+        if out is not None:
+            await out.close()
+        await self._unsubscribe(self._user_channel(call_id, user_id))
+        if call_id not in self.active_connections:
+            await self._unsubscribe(self._call_channel(call_id))
+        return conn_id
+
+    async def disconnect(self, call_id: int, user_id: int, websocket: WebSocket):
+        if not self.disconnect_local(call_id, user_id, websocket):
+            return  # цей сокет уже замінено новішим
+        conn_id = await self._drop(call_id, user_id)
+        try:
+            # поле видаляємо, лише якщо воно досі наше (користувач міг перепідключитись деінде)
+            current = await self.redis.hget(self._presence_key(call_id), str(user_id))
+            if current and current.split(":", 1)[0] == conn_id:
+                await self.redis.hdel(self._presence_key(call_id), str(user_id))
+        except Exception as e:
+            logger.warning(f"[WS PRESENCE] cleanup failed: {e}")
+        logger.info(f"[WS DISCONNECT] User {user_id} disconnected from call {call_id}")
 
     async def send_personal_message(self, message: dict, call_id: int, user_id: int):
-        ws = self.active_connections.get(call_id, {}).get(user_id)
-        if ws and ws.client_state == WebSocketState.CONNECTED:
-            try:
-                await ws.send_json(message)
-            except Exception as e:
-                logger.warning(f"[WS ERROR] send to {user_id}: {e}")
+        await self.broker.publish(self._user_channel(call_id, user_id), ws_frame.pack({}, ws_frame.encode(message)))
 
     async def broadcast(self, call_id: int, message: dict, exclude_user_id: int | None = None):
-        if call_id in self.active_connections:
-            for uid, ws in list(self.active_connections[call_id].items()):
-                if exclude_user_id is None or uid != exclude_user_id:
-                    if ws.client_state == WebSocketState.CONNECTED:
-                        try:
-                            await ws.send_json(message)
-                        except Exception as e:
-                            logger.warning(f"[WS ERROR] broadcast to {uid}: {e}")
+        # кодуємо один раз тут; кожен воркер шле всім своїм учасникам той самий рядок
+        await self.broker.publish(
+            self._call_channel(call_id),
+            ws_frame.pack({"exclude": exclude_user_id}, ws_frame.encode(message)),
+        )
+
+    async def stop(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
 
 connection_manager = ConnectionManager()
 
@@ -134,17 +277,18 @@ async def websocket_endpoint(
     websocket: WebSocket,
     call_id: int,
     token: str = Query(...),
-    db: AsyncSession = Depends(get_async_session),
 ):
+    # Сокет живе довго, тож сесію БД не тримаємо: лише короткі сесії на окремі читання/записи.
     # 1) auth
     try:
-        user = await get_user_from_token(token, db)
-    except HTTPException:
+        user = await authenticate_ws(token)
+    except WSAuthError:
         await websocket.close(code=1008)
         return
 
     # 2) call existence
-    call = await db.get(Call, call_id)
+    async with async_session_maker() as session:
+        call = await session.get(Call, call_id)
     if not call or call.status != "active":
         await websocket.close(code=1008, reason="Invalid or inactive call")
         return
@@ -153,10 +297,10 @@ async def websocket_endpoint(
 
     try:
         # 3) my status + peers list
-        participant_status = await get_cached_participant_status(call_id, user.id, db)
+        participant_status = await get_cached_participant_status(call_id, user.id)
 
         # peers already online (даємо на клієнт одразу user_id учасників)
-        peers = connection_manager.list_peers(call_id, exclude_user_id=user.id)
+        peers = await connection_manager.list_peers(call_id, exclude_user_id=user.id)
         await connection_manager.send_personal_message(
             create_message("peers", user.id, peers=peers, **participant_status),
             call_id, user.id
@@ -195,13 +339,14 @@ async def websocket_endpoint(
                 await connection_manager.broadcast(call_id, create_message("quality_change", user.id, quality=data.quality))
 
             elif data.action == "end_call":
-                # уніфікуємо enum → str
-                role_str = str(getattr(user, "role", "")).lower()
-                status_str = str(getattr(user, "status", "")).lower()
-                if role_str == "staff" and status_str in ["admin", "teacher"]:
-                    call.status = "ended"
-                    call.ended_at = func.now()
-                    await db.commit()
+                if user.role == "staff" and (user.status or "").lower() in ["admin", "teacher"]:
+                    async with async_session_maker() as session:
+                        await session.execute(
+                            update(Call)
+                            .where(Call.id == call_id)
+                            .values(status="ended", ended_at=func.now())
+                        )
+                        await session.commit()
                     await connection_manager.broadcast(call_id, create_message("call_ended", user.id))
                     break
 
@@ -225,4 +370,4 @@ async def websocket_endpoint(
         logger.error(f"[WS FATAL ERROR] {e}")
         await websocket.close(code=1011, reason="Internal error")
     finally:
-        connection_manager.disconnect(call_id, user.id)
+        await connection_manager.disconnect(call_id, user.id, websocket)
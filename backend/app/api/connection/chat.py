@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.sql import func
 from typing import List, Dict, Any
-from app.core.database import get_async_session
+from app.core.database import get_async_session, get_read_session
 from app.core.cache import get_cache, set_cache, delete_cache
 from app.schemas.connection.chat import (
     ChatCreate, ChatResponse, ChatUpdate, ChatWithMessages,
@@ -12,13 +12,13 @@ from app.schemas.connection.chat import (
 from app.models.connection.chat import Chat, ChatMessage
 from app.api.users.auth import current_active_user
 from app.models.users.users import User, Status
+from app.api.connection.chat_ws import broadcast_chat_message, chat_message_payload
 import logging
 
 router = APIRouter(prefix="/chats", tags=["Chats"])
 
 
 logger = logging.getLogger("chat_ws")
-active_chats: Dict[int, List[WebSocket]] = {}
 CACHE_MESSAGE_LIMIT = 100
 
 
@@ -30,7 +30,7 @@ def is_teacher_or_admin(current_user: User):
 @router.get("/", response_model=List[ChatResponse])
 async def list_chats(
     classroom_id: int | None = None,
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(current_active_user),
 ):
     query = select(Chat)
@@ -56,7 +56,7 @@ async def create_chat(
 @router.get("/{chat_id}", response_model=ChatWithMessages)
 async def get_chat(
     chat_id: int,
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(current_active_user),
 ):
     chat = await db.get(Chat, chat_id)
@@ -129,6 +129,8 @@ async def add_message(
     db.add(new_message)
     await db.commit()
     await db.refresh(new_message)
+    # повідомлення з HTTP теж бачать відкриті сокети чату
+    await broadcast_chat_message(chat_id, chat_message_payload(new_message))
     return new_message
 
 
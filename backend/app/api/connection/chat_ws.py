@@ -1,60 +1,79 @@
-from fastapi import WebSocket, WebSocketDisconnect, APIRouter, Depends, Query, status, HTTPException
+from fastapi import WebSocket, WebSocketDisconnect, APIRouter, Query, status
 from pydantic import BaseModel
 from typing import List, Dict, Any
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import func
-from jose import jwt, JWTError
 
-from app.core.database import get_async_session
+from app.api.connection.ws_auth import WSAuthError, authenticate_ws
+from app.core.database import async_session_maker
+from app.core.db_routing import mark_recent_write
 from app.models.connection.chat import ChatMessage, Chat
-from app.models.users.users import User
-from app.core.cache import get_cache, set_cache
+from app.core.cache import redis_client
 from app.core.config import settings
+from app.core import ws_frame
+from app.core.ws_hub import Hub
+from app.core.ws_outbox import DISCONNECT
+from app.utils.chat_write_behind import chat_write_behind
 import logging
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 router = APIRouter(tags=["Chat WebSocket"])
 logger = logging.getLogger("chat_ws")
 
-active_chats: Dict[int, List[WebSocket]] = {}
+# Локальні сокети чатів цього воркера; повідомлення розходяться через брокер (канал на чат),
+# тож записати його може будь-який воркер — отримають усі.
+# відстаючого клієнта відключаємо: після перепідключення він отримає історію з кешу
+hub = Hub("chat", policy=DISCONNECT)
 CACHE_MESSAGE_LIMIT = 100
+CACHE_TTL = 1800
 
 
 class ChatMessageSchema(BaseModel):
     content: str
 
 
-async def get_user_from_token_ws(token: str, db: AsyncSession) -> User:
+def _history_key(chat_id: int) -> str:
+    return f"chat:{chat_id}:history"
+
+
+async def cache_chat_message(chat_id: int, frame: str):
+    """Redis-список останніх CACHE_MESSAGE_LIMIT повідомлень (уже закодованих фреймів).
+
+    RPUSH + LTRIM + EXPIRE однією транзакцією: без читання всієї історії й без гонки записів.
+    """
+    key = _history_key(chat_id)
+    pipe = redis_client.pipeline()
+    pipe.rpush(key, frame)
+    pipe.ltrim(key, -CACHE_MESSAGE_LIMIT, -1)
+    pipe.expire(key, CACHE_TTL)
+    await pipe.execute()
+
+
+def chat_message_payload(message: ChatMessage) -> Dict[str, Any]:
+    return {
+        "id": message.id,
+        "chat_id": message.chat_id,
+        "message": message.message,
+        "user_id": message.user_id,
+        "role": message.role,
+        "sent_at": (message.sent_at or datetime.utcnow()).isoformat(),
+        "is_read": False,
+    }
+
+
+async def broadcast_chat_message(chat_id: int, chat_message: Dict[str, Any]) -> None:
+    """Кеш історії + доставка в сокети чату на всіх воркерах (і з WS, і з HTTP)."""
+    frame = ws_frame.encode(chat_message)
+    await cache_chat_message(chat_id, frame)
     try:
-        payload = jwt.decode(
-            token,
-            settings.secret_key,
-            algorithms=[settings.algorithm],
-            options={"verify_aud": False}
-        )
-        user_id = int(payload.get("sub"))
-        user = await db.get(User, user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        return user
-    except JWTError:
-        raise HTTPException(status_code=403, detail="Invalid token")
-
-
-async def cache_chat_message(chat_id: int, message: Dict[str, Any]):
-    cache_key = f"chat:{chat_id}:messages"
-    messages = await get_cache(cache_key) or []
-    messages.append(message)
-    if len(messages) > CACHE_MESSAGE_LIMIT:
-        messages.pop(0)
-    await set_cache(cache_key, messages, ttl=1800)
-
-
-async def get_cached_chat_messages(chat_id: int) -> List[Dict[str, Any]]:
-    cache_key = f"chat:{chat_id}:messages"
-    return await get_cache(cache_key) or []
+        await hub.publish_frame(chat_id, frame)
+    except Exception as e:
+        logger.error(f"[CHAT WS] publish error: {e}")
+
+
+async def get_cached_chat_frames(chat_id: int) -> List[str]:
+    return await redis_client.lrange(_history_key(chat_id), 0, -1)
 
 
 @router.websocket("/{chat_id}")
@@ -62,29 +81,30 @@ async def chat_websocket(
     websocket: WebSocket,
     chat_id: int,
     token: str = Query(...),
-    db: AsyncSession = Depends(get_async_session)
 ):
+    # Сокет живе довго, тож сесію БД не тримаємо: коротка сесія на перевірку чату й на кожен запис.
     try:
-        current_user = await get_user_from_token_ws(token, db)
-    except HTTPException:
+        current_user = await authenticate_ws(token)
+    except WSAuthError:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
 
-    chat = await db.get(Chat, chat_id)
+    async with async_session_maker() as session:
+        chat = await session.get(Chat, chat_id)
     if not chat:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
 
     await websocket.accept()
 
-    if chat_id not in active_chats:
-        active_chats[chat_id] = []
-    active_chats[chat_id].append(websocket)
+    conn = hub.new_conn(websocket, user_id=current_user.id)
+    await hub.join(chat_id, conn)
     logger.info(f"[CHAT WS] User {current_user.id} connected to chat {chat_id}")
 
-    cached_messages = await get_cached_chat_messages(chat_id)
-    for message in cached_messages:
-        await websocket.send_text(json.dumps(message, default=str))
+    # реплей історії одним фреймом-масивом; елементи вже закодовані — лише склеюємо
+    history = await get_cached_chat_frames(chat_id)
+    if history:
+        conn["out"].send("[" + ",".join(history) + "]")
 
     try:
         while True:
@@ -97,42 +117,35 @@ async def chat_websocket(
                 await websocket.close(code=1003)
                 return
 
-            new_message = ChatMessage(
-                chat_id=chat_id,
-                user_id=current_user.id,
-                role=current_user.role,
-                message=message.content,
-                sent_at=func.now()
-            )
-            db.add(new_message)
-            await db.commit()
-            await db.refresh(new_message)
-
-            chat_message = {
-                "id": new_message.id,
-                "chat_id": chat_id,
-                "message": message.content,
-                "user_id": current_user.id,
-                "role": current_user.role,
-                "sent_at": (new_message.sent_at or datetime.utcnow()).isoformat(),
-                "is_read": False,
-            }
-            
-            await cache_chat_message(chat_id, chat_message)
-
-            for connection in list(active_chats[chat_id]):
-                try:
-                    await connection.send_text(json.dumps(chat_message))
-                except Exception as e:
-                    logger.error(f"Error sending message: {e}")
-                    try:
-                        await connection.close()
-                    except:
-                        pass
-                    active_chats[chat_id].remove(connection)
+            if settings.chat_write_behind:
+                # id одразу (з заздалегідь зарезервованого блоку), запис у БД — фоновою пачкою
+                new_message = ChatMessage(
+                    id=await chat_write_behind.next_id(),
+                    chat_id=chat_id,
+                    user_id=current_user.id,
+                    role=current_user.role,
+                    message=message.content,
+                    sent_at=datetime.now(timezone.utc),
+                    is_read=False,
+                )
+                chat_write_behind.enqueue(new_message)
+            else:
+                new_message = ChatMessage(
+                    chat_id=chat_id,
+                    user_id=current_user.id,
+                    role=current_user.role,
+                    message=message.content,
+                    sent_at=func.now()
+                )
+                async with async_session_maker() as session:
+                    session.add(new_message)
+                    await session.commit()
+                    await session.refresh(new_message)
+
+            await broadcast_chat_message(chat_id, chat_message_payload(new_message))
+            await mark_recent_write(current_user.id)
 
     except WebSocketDisconnect:
         logger.info(f"[CHAT WS] User {current_user.id} disconnected from chat {chat_id}")
-        active_chats[chat_id].remove(websocket)
-        if not active_chats[chat_id]:
-            del active_chats[chat_id]
\ No newline at end of file
+    finally:
+        await hub.leave(chat_id, websocket)
\ No newline at end of file
@@ -1,11 +1,13 @@
-from fastapi import WebSocket, WebSocketDisconnect, APIRouter, Depends, Query, status, HTTPException
-from typing import Dict, List, Any
-from sqlalchemy.ext.asyncio import AsyncSession
-from jose import jwt, JWTError
-
-from app.core.database import get_async_session
-from app.models.users.users import User
-from app.core.config import settings
+from fastapi import WebSocket, WebSocketDisconnect, APIRouter, Query, status
+from typing import Dict, Any
+from sqlalchemy.future import select
+
+from app.api.connection.ws_auth import UserSnapshot, WSAuthError, authenticate_ws
+from app.core.database import async_session_maker
+from app.core.db_routing import mark_recent_write
+from app.models.controls.lesson_attempt import LessonAttempt
+from app.utils.answer_autosave import answer_autosave
+from app.core.ws_hub import Hub
 import logging
 import json
 
@@ -13,8 +15,9 @@ import json
 router = APIRouter(tags=["Classroom WebSocket"])
 logger = logging.getLogger("classroom_ws")
 
-# classroom_id -> list of {"ws": WebSocket, "user_id": int, "role": str}
-active_rooms: Dict[int, List[Dict[str, Any]]] = {}
+# Кімнати класів: лише зʼєднання ЦЬОГО воркера ({"id", "ws", "user_id", "role"});
+# між воркерами події ходять через брокер (канал на клас), див. app/core/ws_hub.py
+hub = Hub("classroom")
 
 # Події, які дозволено ретранслювати
 ALLOWED_EVENTS = {"go_after_me", "call_started", "call_ended", "answer_update"}
@@ -22,34 +25,24 @@ ALLOWED_EVENTS = {"go_after_me", "call_started", "call_ended", "answer_update"}
 STAFF_ONLY_EVENTS = {"go_after_me"}
 
 
-async def get_user_from_token_ws(token: str, db: AsyncSession) -> User:
-    try:
-        payload = jwt.decode(
-            token,
-            settings.secret_key,
-            algorithms=[settings.algorithm],
-            options={"verify_aud": False},
-        )
-        user_id = int(payload.get("sub"))
-        user = await db.get(User, user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        return user
-    except JWTError:
-        raise HTTPException(status_code=403, detail="Invalid token")
-
-
-def _is_staff(user: User) -> bool:
-    return getattr(user, "role", None) == "staff" or bool(getattr(user, "is_superuser", False))
-
-
-def _disconnect(classroom_id: int, websocket: WebSocket) -> None:
-    room = active_rooms.get(classroom_id)
-    if not room:
-        return
-    active_rooms[classroom_id] = [c for c in room if c["ws"] is not websocket]
-    if not active_rooms[classroom_id]:
-        active_rooms.pop(classroom_id, None)
+def _is_staff(user: UserSnapshot) -> bool:
+    return user.role == "staff" or user.is_superuser
+
+
+async def _attempt_lesson_id(attempt_id, user_id: int) -> int | None:
+    """lesson_id незавершеної спроби цього учня, інакше None."""
+    if not isinstance(attempt_id, int):
+        return None
+    async with async_session_maker() as session:
+        return (
+            await session.execute(
+                select(LessonAttempt.lesson_id).where(
+                    LessonAttempt.id == attempt_id,
+                    LessonAttempt.student_id == user_id,
+                    LessonAttempt.status == "in_progress",
+                )
+            )
+        ).scalar_one_or_none()
 
 
 @router.websocket("/{classroom_id}")
@@ -57,22 +50,23 @@ async def classroom_websocket(
     websocket: WebSocket,
     classroom_id: int,
     token: str = Query(...),
-    db: AsyncSession = Depends(get_async_session),
 ):
     try:
-        user = await get_user_from_token_ws(token, db)
-    except HTTPException:
+        user = await authenticate_ws(token)
+    except WSAuthError:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
 
     await websocket.accept()
 
     staff = _is_staff(user)
-    conn = {"ws": websocket, "user_id": user.id, "role": "staff" if staff else "student"}
-    active_rooms.setdefault(classroom_id, []).append(conn)
+    conn = hub.new_conn(websocket, user_id=user.id, role="staff" if staff else "student")
+    await hub.join(classroom_id, conn)
     logger.info(
         f"[CLASSROOM WS] user {user.id} ({conn['role']}) joined classroom {classroom_id}"
     )
+    # attempt_id -> lesson_id (None — чужа/завершена спроба); перевіряємо раз на зʼєднання
+    attempts: Dict[int, int | None] = {}
 
     try:
         while True:
@@ -102,29 +96,38 @@ async def classroom_websocket(
                 payload["question_id"] = msg.get("question_id")
                 payload["value"] = msg.get("value")
 
+                # з attempt_id — ще й зберігаємо (дебаунс і пакетний запис в answer_autosave)
+                attempt_id = msg.get("attempt_id")
+                if attempt_id is not None and not staff and isinstance(payload["block_id"], int):
+                    if attempt_id not in attempts:
+                        attempts[attempt_id] = await _attempt_lesson_id(attempt_id, user.id)
+                    lesson_id = attempts[attempt_id]
+                    question_id = payload["question_id"]
+                    if lesson_id is not None and (question_id is None or isinstance(question_id, int)):
+                        if answer_autosave.put(
+                            lesson_id, attempt_id, payload["block_id"], question_id, payload["value"]
+                        ):
+                            await mark_recent_write(user.id)
+                        else:
+                            attempts[attempt_id] = None  # спробу завершено — більше не зберігаємо
+
             # answer_update бачить лише викладач; решта подій — усім, крім відправника
-            staff_only_target = etype == "answer_update"
-            for c in list(active_rooms.get(classroom_id, [])):
-                if c["ws"] is websocket:
-                    continue
-                if staff_only_target and c["role"] != "staff":
-                    continue
-                try:
-                    await c["ws"].send_text(json.dumps(payload))
-                except Exception as e:
-                    logger.error(f"[CLASSROOM WS] send error: {e}")
-                    try:
-                        await c["ws"].close()
-                    except Exception:
-                        pass
-                    _disconnect(classroom_id, c["ws"])
+            try:
+                await hub.publish(
+                    classroom_id,
+                    payload,
+                    exclude=conn["id"],
+                    roles={"staff"} if etype == "answer_update" else None,
+                )
+            except Exception as e:
+                logger.error(f"[CLASSROOM WS] publish error: {e}")
 
     except WebSocketDisconnect:
-        _disconnect(classroom_id, websocket)
+        await hub.leave(classroom_id, websocket)
         logger.info(f"[CLASSROOM WS] user {user.id} left classroom {classroom_id}")
     except Exception as e:
         logger.error(f"[CLASSROOM WS] unexpected error: {e}")
-        _disconnect(classroom_id, websocket)
+        await hub.leave(classroom_id, websocket)
         try:
             await websocket.close()
         except Exception:
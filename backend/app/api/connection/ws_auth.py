@@ -0,0 +1,90 @@
+"""Спільна автентифікація WebSocket-ів (класи, чати, дзвінки).
+
+JWT перевіряємо локально, а замість ORM-обʼєкта User беремо компактний незмінний
+знімок (id, username, role, status, прапорці) з кешу (L1 воркера -> Redis) або з БД.
+До БД ходимо короткою власною сесією, тож зʼєднання з пулу повертається одразу,
+а не висить весь час життя сокета.
+
+Зміна користувача (ролі, статусу, видалення) -> `invalidate_user_snapshot`;
+delete_cache прибирає знімок і з L1 інших воркерів.
+"""
+from dataclasses import astuple, dataclass
+
+from jose import JWTError, jwt
+
+from app.core.cache import delete_cache, get_cache, set_cache
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.users.users import User
+
+REDIS_TTL = 300
+
+
+class WSAuthError(Exception):
+    """Невалідний токен або користувача немає / він неактивний."""
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    id: int
+    username: str
+    role: str
+    status: str | None
+    is_superuser: bool = False
+    is_admin: bool = False
+    is_active: bool = True
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            username=user.username,
+            role=user.role,
+            status=user.status,
+            is_superuser=bool(user.is_superuser),
+            is_admin=bool(user.is_admin),
+            is_active=bool(user.is_active),
+        )
+
+
+def _cache_key(user_id: int) -> str:
+    return f"ws_user:{user_id}"
+
+
+def decode_ws_token(token: str) -> int:
+    try:
+        payload = jwt.decode(
+            token,
+            settings.secret_key,
+            algorithms=[settings.algorithm],
+            options={"verify_aud": False},
+        )
+        return int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
+        raise WSAuthError("Invalid token")
+
+
+async def get_user_snapshot(user_id: int) -> UserSnapshot | None:
+    """Кеш (L1 -> Redis) -> БД (коротка сесія)."""
+    # у кеші — списком, щоб object_hook кешу не чіпав рядки
+    cached = await get_cache(_cache_key(user_id))
+    if cached:
+        return UserSnapshot(*cached)
+    async with async_session_maker() as session:
+        user = await session.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = UserSnapshot.from_user(user)
+    await set_cache(_cache_key(user_id), list(astuple(snapshot)), ttl=REDIS_TTL)
+    return snapshot
+
+
+async def authenticate_ws(token: str) -> UserSnapshot:
+    snapshot = await get_user_snapshot(decode_ws_token(token))
+    if snapshot is None or not snapshot.is_active:
+        raise WSAuthError("User not found")
+    return snapshot
+
+
+async def invalidate_user_snapshot(user_id: int) -> None:
+    await delete_cache(_cache_key(user_id))
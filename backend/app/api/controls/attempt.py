@@ -1,18 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends
+import base64
+import json
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from sqlalchemy import Boolean, Float, Integer, Text, case, cast, column, func, tuple_, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from datetime import datetime
+from typing import Iterable
 
-from app.core.database import get_async_session
+from app.core.database import get_async_session, get_read_session
 from app.api.users.auth import current_active_user
 from app.models.users.users import User
 from app.models.controls.lessons import Lesson
-from app.models.controls.block import Block
-from app.models.controls.questions import Question
 from app.models.controls.lesson_attempt import LessonAttempt
 from app.models.controls.answer import Answer
 from app.models.classrooms.classroom import Classroom
+from app.utils.answer_key import get_answer_key
+from app.utils.answers import graded_rows, upsert_answers
+from app.utils.answer_autosave import answer_autosave
+from app.utils.attempt_score import score_attempt
 from app.schemas.controls.attempt import (
     AttemptStart,
     AttemptResponse,
@@ -20,25 +26,32 @@ from app.schemas.controls.attempt import (
     AnswerSubmit,
     AnswerResponse,
     AnswerGrade,
+    AnswerGradeBatch,
+    AnswerGradeItem,
+    AnswerGradeBatchResult,
     AttemptGrade,
     MyAttemptItem,
+    AttemptMatrixResponse,
+    MatrixCell,
+    MatrixStudent,
+    MatrixQuestion,
 )
 
 router = APIRouter(prefix="/attempts", tags=["Attempts"])
 
-# типи, де можлива автоматична (бот) перевірка
-AUTO_TYPES = {"multiple_choice", "true_false", "gap_fill", "short_answer"}
-
-
-def _norm(s):
-    return (s or "").strip().lower()
-
-
-def bot_check(student_answer, correct_answer, task_type):
-    """True/False для обʼєктивних типів, None — якщо автоперевірка неможлива."""
-    if not correct_answer or task_type not in AUTO_TYPES:
-        return None
-    return _norm(student_answer) == _norm(correct_answer)
+# keyset-пагінація списків спроб: розмір сторінки й заголовок з курсором наступної
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# збережені підсумки спроби — для списків без звернення до answers
+SCORE_COLUMNS = (
+    LessonAttempt.auto_score,
+    LessonAttempt.max_auto_score,
+    LessonAttempt.answered_count,
+    LessonAttempt.section_scores,
+    LessonAttempt.time_spent_seconds,
+)
 
 
 def is_staff(user: User) -> bool:
@@ -50,6 +63,57 @@ def is_staff(user: User) -> bool:
     )
 
 
+def _scope_to_my_students(query, current_user: User, show_all: bool = False):
+    """Обмежує спроби учнями з класів поточного вчителя.
+    Адміни (is_admin / status='admin') з show_all=True бачать усе."""
+    is_admin_user = bool(getattr(current_user, "is_admin", False)) or (getattr(current_user, "status", None) == "admin")
+    if is_admin_user and show_all:
+        return query
+    my_students_subq = (
+        select(Classroom.student_id)
+        .where(Classroom.teacher_id == current_user.id)
+        .where(Classroom.student_id.is_not(None))
+    )
+    return query.where(LessonAttempt.student_id.in_(my_students_subq))
+
+
+def _encode_cursor(started_at: datetime, attempt_id: int) -> str:
+    raw = json.dumps([started_at.isoformat(), attempt_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        started_at, attempt_id = json.loads(raw)
+        return datetime.fromisoformat(started_at), int(attempt_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _attempts_page(
+    session: AsyncSession, query, cursor: str | None, limit: int, response: Response
+) -> list[dict]:
+    """Keyset по (started_at, id) від новіших до старіших.
+
+    Курсор наступної сторінки віддаємо в заголовку X-Next-Cursor, тіло лишається списком.
+    """
+    if cursor:
+        started_at, attempt_id = _decode_cursor(cursor)
+        query = query.where(
+            tuple_(LessonAttempt.started_at, LessonAttempt.id) < tuple_(started_at, attempt_id)
+        )
+    query = query.order_by(LessonAttempt.started_at.desc(), LessonAttempt.id.desc()).limit(limit + 1)
+
+    rows = [dict(r._mapping) for r in (await session.execute(query)).all()]
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if last["started_at"] is not None:
+            response.headers[NEXT_CURSOR_HEADER] = _encode_cursor(last["started_at"], last["id"])
+    return rows
+
+
 async def _load_attempt_full(session: AsyncSession, attempt_id: int) -> LessonAttempt | None:
     result = await session.execute(
         select(LessonAttempt)
@@ -98,30 +162,28 @@ async def start_attempt(
 
 @router.get("/my", response_model=list[MyAttemptItem])
 async def get_my_attempts(
-    session: AsyncSession = Depends(get_async_session),
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(current_active_user),
 ):
-    """Усі спроби поточного учня (для сторінки «Мої результати»)."""
-    result = await session.execute(
-        select(LessonAttempt, Lesson.title)
+    """Спроби поточного учня (для сторінки «Мої результати»), сторінками від новіших."""
+    query = (
+        select(
+            LessonAttempt.id,
+            LessonAttempt.lesson_id,
+            Lesson.title.label("lesson_title"),
+            LessonAttempt.status,
+            LessonAttempt.overall_grade,
+            LessonAttempt.started_at,
+            LessonAttempt.completed_at,
+            *SCORE_COLUMNS,
+        )
         .join(Lesson, Lesson.id == LessonAttempt.lesson_id)
         .where(LessonAttempt.student_id == current_user.id)
-        .order_by(LessonAttempt.started_at.desc())
     )
-    items = []
-    for attempt, title in result.all():
-        items.append(
-            MyAttemptItem(
-                id=attempt.id,
-                lesson_id=attempt.lesson_id,
-                lesson_title=title,
-                status=attempt.status,
-                overall_grade=attempt.overall_grade,
-                started_at=attempt.started_at,
-                completed_at=attempt.completed_at,
-            )
-        )
-    return items
+    return await _attempts_page(session, query, cursor, limit, response)
 
 
 @router.get("/{attempt_id}", response_model=AttemptFullResponse)
@@ -163,41 +225,125 @@ async def get_my_attempt(
 @router.get("/lesson/{lesson_id}", response_model=list[AttemptResponse])
 async def get_lesson_attempts(
     lesson_id: int,
+    response: Response,
     all: bool = False,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(current_active_user),
 ):
     """Список спроб уроку (для вчителя/адміна). Повертає username учня.
     За замовчуванням віддає лише спроби учнів, які є в класах поточного вчителя.
-    Адміни (is_admin / status='admin') бачать усе. Параметр ?all=1 — також показати всі (для адмінів)."""
+    Адміни (is_admin / status='admin') бачать усе. Параметр ?all=1 — також показати всі (для адмінів).
+    Сторінки: ?limit=&cursor= (курсор наступної — у заголовку X-Next-Cursor)."""
     if not is_staff(current_user):
         raise HTTPException(status_code=403, detail="Not allowed")
 
-    is_admin_user = bool(getattr(current_user, "is_admin", False)) or (getattr(current_user, "status", None) == "admin")
-
     query = (
-        select(LessonAttempt, User.username)
+        select(
+            LessonAttempt.id,
+            LessonAttempt.lesson_id,
+            LessonAttempt.student_id,
+            LessonAttempt.status,
+            LessonAttempt.overall_grade,
+            LessonAttempt.teacher_comment,
+            LessonAttempt.started_at,
+            LessonAttempt.completed_at,
+            *SCORE_COLUMNS,
+            User.username.label("student_username"),
+        )
         .join(User, User.id == LessonAttempt.student_id)
         .where(LessonAttempt.lesson_id == lesson_id)
-        .order_by(LessonAttempt.started_at.desc())
     )
 
-    if not (is_admin_user and all):
-        # обмежуємо учнями, прив'язаними до класів цього вчителя
-        my_students_subq = (
-            select(Classroom.student_id)
-            .where(Classroom.teacher_id == current_user.id)
-            .where(Classroom.student_id.is_not(None))
+    query = _scope_to_my_students(query, current_user, all)
+    return await _attempts_page(session, query, cursor, limit, response)
+
+
+@router.get("/lesson/{lesson_id}/matrix", response_model=AttemptMatrixResponse)
+async def get_lesson_matrix(
+    lesson_id: int,
+    all: bool = False,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(current_active_user),
+):
+    """Матриця учень × питання для дашборду оцінювання — одним запитом з браузера.
+
+    Береться остання спроба кожного учня; агрегати рахує Postgres (GROUP BY / FILTER).
+    Видимість учнів — як у списку спроб уроку (?all=1 для адмінів)."""
+    if not is_staff(current_user):
+        raise HTTPException(status_code=403, detail="Not allowed")
+
+    latest = _scope_to_my_students(
+        select(
+            LessonAttempt.id.label("attempt_id"),
+            LessonAttempt.student_id,
+            LessonAttempt.status,
+        )
+        .where(LessonAttempt.lesson_id == lesson_id)
+        .distinct(LessonAttempt.student_id)
+        .order_by(
+            LessonAttempt.student_id,
+            LessonAttempt.started_at.desc(),
+            LessonAttempt.id.desc(),
+        ),
+        current_user,
+        all,
+    ).subquery("latest")
+
+    cells = await session.execute(
+        select(
+            latest.c.student_id,
+            Answer.block_id,
+            Answer.question_id,
+            Answer.is_correct,
+            Answer.bot_score,
+            Answer.teacher_grade,
+        )
+        .select_from(Answer)
+        .join(latest, latest.c.attempt_id == Answer.attempt_id)
+        .order_by(latest.c.student_id, Answer.block_id, Answer.question_id)
+    )
+
+    students = await session.execute(
+        select(
+            latest.c.student_id,
+            User.username.label("student_username"),
+            latest.c.attempt_id,
+            latest.c.status,
+            func.count(Answer.id).label("answered"),
+            func.count(Answer.id).filter(Answer.is_correct.is_(True)).label("correct"),
+            func.coalesce(func.sum(Answer.bot_score), 0.0).label("bot_score"),
+            func.avg(Answer.teacher_grade).label("teacher_grade_avg"),
+        )
+        .select_from(latest)
+        .join(User, User.id == latest.c.student_id)
+        .outerjoin(Answer, Answer.attempt_id == latest.c.attempt_id)
+        .group_by(latest.c.student_id, User.username, latest.c.attempt_id, latest.c.status)
+        .order_by(User.username)
+    )
+
+    questions = await session.execute(
+        select(
+            Answer.block_id,
+            Answer.question_id,
+            func.count(Answer.id).label("answered"),
+            func.count(Answer.id).filter(Answer.is_correct.is_(True)).label("correct"),
+            func.avg(Answer.bot_score).label("bot_score_avg"),
+            func.avg(Answer.teacher_grade).label("teacher_grade_avg"),
         )
-        query = query.where(LessonAttempt.student_id.in_(my_students_subq))
+        .select_from(Answer)
+        .join(latest, latest.c.attempt_id == Answer.attempt_id)
+        .group_by(Answer.block_id, Answer.question_id)
+        .order_by(Answer.block_id, Answer.question_id)
+    )
 
-    result = await session.execute(query)
-    items = []
-    for attempt, username in result.all():
-        payload = AttemptResponse.model_validate(attempt).model_dump()
-        payload["student_username"] = username
-        items.append(payload)
-    return items
+    return AttemptMatrixResponse(
+        lesson_id=lesson_id,
+        students=[MatrixStudent(**r._mapping) for r in students.all()],
+        questions=[MatrixQuestion(**r._mapping) for r in questions.all()],
+        cells=[MatrixCell(**r._mapping) for r in cells.all()],
+    )
 
 
 # ---------- відповіді ----------
@@ -214,47 +360,58 @@ async def submit_answer(
     if not attempt:
         raise HTTPException(status_code=404, detail="Attempt not found")
 
-    block = (
-        await session.execute(select(Block).where(Block.id == data.block_id))
-    ).scalar_one_or_none()
-    if not block:
+    # правильні відповіді — з ключа уроку в памʼяті, без запитів до БД
+    key = await get_answer_key(session, attempt.lesson_id)
+    if data.block_id not in key.blocks:
         raise HTTPException(status_code=404, detail="Block not found")
+    if not key.knows(data.block_id, data.question_id):
+        raise HTTPException(status_code=404, detail="Question not found")
+
+    # upsert: одна відповідь на (attempt, block, question) — один стейтмент
+    rows = graded_rows(key, attempt_id, [(data.block_id, data.question_id, data.student_answer)])
+    [answer] = await upsert_answers(session, rows)
+    await session.commit()
+    return answer
 
-    correct = None
-    if data.question_id:
-        question = (
-            await session.execute(select(Question).where(Question.id == data.question_id))
-        ).scalar_one_or_none()
-        correct = question.correct_answer if question else None
 
-    is_correct = bot_check(data.student_answer, correct, block.task_type)
-    bot_score = None if is_correct is None else (1.0 if is_correct else 0.0)
+@router.post("/{attempt_id}/answers:batch", response_model=list[AnswerResponse])
+async def submit_answers_batch(
+    attempt_id: int,
+    data: list[AnswerSubmit],
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(current_active_user),
+):
+    """Пакетна здача відповідей (напр. увесь урок наприкінці заняття).
 
-    # upsert: одна відповідь на (attempt, block, question)
-    q = select(Answer).where(
-        Answer.attempt_id == attempt_id, Answer.block_id == data.block_id
+    Перевірка йде по ключу відповідей уроку в памʼяті, усе записується
+    одним INSERT ... ON CONFLICT в одній транзакції.
+    """
+    attempt = (
+        await session.execute(select(LessonAttempt).where(LessonAttempt.id == attempt_id))
+    ).scalar_one_or_none()
+    if not attempt:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    if not data:
+        return []
+
+    # одна відповідь на (block, question): якщо ключ повторюється — перемагає остання
+    submits = {(d.block_id, d.question_id): d for d in data}
+    key = await get_answer_key(session, attempt.lesson_id)
+    missing = {block_id for block_id, _ in submits} - key.blocks.keys()
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Block {min(missing)} not found")
+    # питання з іншого уроку чи блоку інакше впало б на FK уже в upsert (500)
+    unknown = {q for b, q in submits if not key.knows(b, q)}
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Question {min(unknown)} not found")
+
+    rows = graded_rows(
+        key, attempt_id, [(d.block_id, d.question_id, d.student_answer) for d in submits.values()]
     )
-    q = q.where(Answer.question_id.is_(None) if data.question_id is None else Answer.question_id == data.question_id)
-    answer = (await session.execute(q)).scalar_one_or_none()
-
-    if answer:
-        answer.student_answer = data.student_answer
-        answer.is_correct = is_correct
-        answer.bot_score = bot_score
-    else:
-        answer = Answer(
-            attempt_id=attempt_id,
-            block_id=data.block_id,
-            question_id=data.question_id,
-            student_answer=data.student_answer,
-            is_correct=is_correct,
-            bot_score=bot_score,
-        )
-        session.add(answer)
 
+    answers = await upsert_answers(session, rows)
     await session.commit()
-    await session.refresh(answer)
-    return answer
+    return answers
 
 
 @router.post("/{attempt_id}/complete", response_model=AttemptResponse)
@@ -269,8 +426,13 @@ async def complete_attempt(
     if not attempt:
         raise HTTPException(status_code=404, detail="Attempt not found")
 
+    # буфери автозбереження всіх воркерів (сокет класу зазвичай не на цьому) — в БД до підрахунку;
+    # далі автозбереження цю спробу не приймає
+    await answer_autosave.finish(attempt_id)
+
     attempt.status = "completed"
     attempt.completed_at = datetime.utcnow()
+    await score_attempt(session, attempt)
     await session.commit()
     await session.refresh(attempt)
     return attempt
@@ -320,4 +482,121 @@ async def grade_attempt(
         setattr(attempt, key, value)
     await session.commit()
     await session.refresh(attempt)
-    return attempt
\ No newline at end of file
+    return attempt
+
+
+def _grades_update_stmt(grades_in: Iterable[AnswerGradeItem]):
+    """UPDATE answers ... FROM (VALUES ...) для пачки оцінок."""
+    rows = []
+    for g in grades_in:
+        fields = g.model_dump(exclude_unset=True)
+        rows.append(
+            (
+                g.answer_id,
+                g.teacher_grade,
+                g.teacher_feedback,
+                "teacher_grade" in fields,
+                "teacher_feedback" in fields,
+            )
+        )
+    grades = values(
+        column("answer_id", Integer),
+        column("teacher_grade", Float),
+        column("teacher_feedback", Text),
+        column("set_grade", Boolean),
+        column("set_feedback", Boolean),
+        name="grades",
+    ).data(rows)
+
+    # NULL у VALUES без типу Postgres вважає text (напр. пачка лише з відгуками) — явні CAST
+    return (
+        update(Answer)
+        .where(Answer.id == grades.c.answer_id)
+        .values(
+            teacher_grade=case(
+                (grades.c.set_grade, cast(grades.c.teacher_grade, Float)), else_=Answer.teacher_grade
+            ),
+            teacher_feedback=case(
+                (grades.c.set_feedback, cast(grades.c.teacher_feedback, Text)),
+                else_=Answer.teacher_feedback,
+            ),
+        )
+        .returning(
+            Answer.id,
+            Answer.attempt_id,
+            Answer.block_id,
+            Answer.question_id,
+            Answer.student_answer,
+            Answer.is_correct,
+            Answer.bot_score,
+            Answer.teacher_grade,
+            Answer.teacher_feedback,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _apply_grades(
+    session: AsyncSession, data: AnswerGradeBatch, attempt_id: int | None = None
+) -> AnswerGradeBatchResult:
+    """Усі оцінки одним UPDATE ... FROM (VALUES ...), за потреби — перерахунок overall_grade
+    тим самим транзакційним проходом. attempt_id обмежує оновлення однією спробою."""
+    if not data.grades:
+        return AnswerGradeBatchResult()
+
+    items = {g.answer_id: g for g in data.grades}  # повтор answer_id — перемагає останній
+    stmt = _grades_update_stmt(items.values())
+    if attempt_id is not None:
+        stmt = stmt.where(Answer.attempt_id == attempt_id)
+
+    updated = [dict(r._mapping) for r in (await session.execute(stmt)).all()]
+    missing = items.keys() - {r["id"] for r in updated}
+    if missing:
+        await session.rollback()
+        raise HTTPException(status_code=404, detail=f"Answer {min(missing)} not found")
+
+    overall = {}
+    if data.recompute_overall:
+        # overall_grade = сума балів: оцінка вчителя, а де її нема — бот-бал
+        attempt_ids = {r["attempt_id"] for r in updated}
+        total = (
+            select(func.sum(func.coalesce(Answer.teacher_grade, Answer.bot_score)))
+            .where(Answer.attempt_id == LessonAttempt.id)
+            .scalar_subquery()
+        )
+        result = await session.execute(
+            update(LessonAttempt)
+            .where(LessonAttempt.id.in_(attempt_ids))
+            .values(overall_grade=total)
+            .returning(LessonAttempt.id, LessonAttempt.overall_grade)
+            .execution_options(synchronize_session=False)
+        )
+        overall = dict(result.all())
+
+    await session.commit()
+    return AnswerGradeBatchResult(answers=updated, overall_grades=overall)
+
+
+@router.put("/grades", response_model=AnswerGradeBatchResult)
+async def grade_answers_bulk(
+    data: AnswerGradeBatch,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(current_active_user),
+):
+    """Масове оцінювання відповідей із різних спроб (напр. письмові завдання всієї групи)."""
+    if not is_staff(current_user):
+        raise HTTPException(status_code=403, detail="Not allowed")
+    return await _apply_grades(session, data)
+
+
+@router.put("/{attempt_id}/grades", response_model=AnswerGradeBatchResult)
+async def grade_attempt_answers(
+    attempt_id: int,
+    data: AnswerGradeBatch,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(current_active_user),
+):
+    """Масове оцінювання відповідей однієї спроби."""
+    if not is_staff(current_user):
+        raise HTTPException(status_code=403, detail="Not allowed")
+    return await _apply_grades(session, data, attempt_id)
@@ -1,49 +1,44 @@
-import json
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, defer
 from typing import List
 from app.api.deps import require_staff
 
 from app.core.database import get_async_session
 from app.api.users.auth import current_active_user
 from app.models.users.users import User
+from app.models.controls.lessons import Lesson
 from app.models.controls.section import Section
 from app.models.controls.block import Block
 from app.models.controls.questions import Question
+from app.utils.answer_key import lesson_id_for_section
+from app.utils.lesson_content import bump_content_version
 from app.schemas.controls.block import (
     BlockCreate,
     BlockUpdate,
     BlockResponse,
     BlockQuestionResponse,
 )
+from app.schemas.controls.lesson_full import LessonFullResponse, SectionFullResponse
 
 router = APIRouter(prefix="/blocks", tags=["Blocks"])
 
 
-# ---------- серіалізація (config/options у БД лежать як JSON-текст) ----------
-def parse_json(value):
-    if not value:
-        return None
-    try:
-        return json.loads(value)
-    except (ValueError, TypeError):
-        return None
-
-
-def question_to_response(q: Question) -> BlockQuestionResponse:
+# ---------- серіалізація (config/options — JSONB, приходять уже розібраними) ----------
+def question_to_response(q: Question, include_answers: bool = True) -> BlockQuestionResponse:
+    # include_answers=False: колонки відповідей не чіпаємо взагалі (для учнів вони defer-нуті)
     return BlockQuestionResponse(
         id=q.id,
         question_text=q.question_text,
-        options=parse_json(q.options),
-        correct_answer=q.correct_answer,
-        explanation=q.explanation,
+        options=q.options,
+        correct_answer=q.correct_answer if include_answers else None,
+        explanation=q.explanation if include_answers else None,
         order=q.order,
     )
 
 
-def block_to_response(b: Block) -> BlockResponse:
+def block_to_response(b: Block, include_answers: bool = True) -> BlockResponse:
     questions = sorted(b.questions, key=lambda x: x.order) if b.questions else []
     return BlockResponse(
         id=b.id,
@@ -57,8 +52,47 @@ def block_to_response(b: Block) -> BlockResponse:
         description=b.description,
         media_url=b.media_url,
         word_list=b.word_list,
-        config=parse_json(b.config),
-        questions=[question_to_response(q) for q in questions],
+        config=b.config,
+        questions=[question_to_response(q, include_answers) for q in questions],
+    )
+
+
+# ---------- дерево уроку (урок -> секції -> блоки -> питання) ----------
+def lesson_tree_options(include_answers: bool = True):
+    """selectinload усього дерева. Для учнів correct_answer/explanation не вантажимо з БД;
+    raiseload — щоб випадковий доступ до них падав, а не тягнув дані мовчки."""
+    questions = (
+        selectinload(Lesson.lesson_sections)
+        .selectinload(Section.blocks)
+        .selectinload(Block.questions)
+    )
+    if not include_answers:
+        questions = questions.options(
+            defer(Question.correct_answer, raiseload=True),
+            defer(Question.explanation, raiseload=True),
+        )
+    return questions
+
+
+def lesson_to_response(lesson: Lesson, include_answers: bool = True) -> LessonFullResponse:
+    """Один прохід по дереву; порядок уже задають order_by у relationship-ах."""
+    return LessonFullResponse(
+        id=lesson.id,
+        title=lesson.title,
+        level=lesson.level,
+        lesson_type=lesson.lesson_type,
+        sections=[
+            SectionFullResponse(
+                id=s.id,
+                lesson_id=s.lesson_id,
+                title=s.title,
+                kind=s.kind,
+                icon=s.icon,
+                order=s.order,
+                blocks=[block_to_response(b, include_answers) for b in s.blocks],
+            )
+            for s in lesson.lesson_sections
+        ],
     )
 
 
@@ -93,7 +127,7 @@ async def create_block(
         description=data.description,
         media_url=data.media_url,
         word_list=data.word_list,
-        config=json.dumps(data.config) if data.config is not None else None,
+        config=data.config,
     )
     session.add(block)
     await session.flush()  # отримуємо block.id до коміту
@@ -103,13 +137,14 @@ async def create_block(
             Question(
                 block_id=block.id,
                 question_text=q.question_text,
-                options=json.dumps(q.options) if q.options is not None else None,
+                options=q.options,
                 correct_answer=q.correct_answer,
                 explanation=q.explanation,
                 order=q.order,
             )
         )
 
+    await bump_content_version(session, section.lesson_id)
     await session.commit()
     block = await _load_block(session, block.id)
     return block_to_response(block)
@@ -145,10 +180,6 @@ async def update_block(
     payload = data.model_dump(exclude_unset=True)
     new_questions = payload.pop("questions", None)
 
-    if "config" in payload:
-        payload["config"] = (
-            json.dumps(payload["config"]) if payload["config"] is not None else None
-        )
     for key, value in payload.items():
         setattr(block, key, value)
 
@@ -162,13 +193,15 @@ async def update_block(
                 Question(
                     block_id=block.id,
                     question_text=q.get("question_text"),
-                    options=json.dumps(q["options"]) if q.get("options") is not None else None,
+                    options=q.get("options"),
                     correct_answer=q.get("correct_answer"),
                     explanation=q.get("explanation"),
                     order=q.get("order", 0),
                 )
             )
 
+    lesson_id = await lesson_id_for_section(session, block.section_id)
+    await bump_content_version(session, lesson_id)
     await session.commit()
     block = await _load_block(session, block_id)
     return block_to_response(block)
@@ -186,5 +219,7 @@ async def delete_block(
     if not block:
         raise HTTPException(status_code=404, detail="Block not found")
 
+    lesson_id = await lesson_id_for_section(session, block.section_id)
     await session.delete(block)
-    await session.commit()
\ No newline at end of file
+    await bump_content_version(session, lesson_id)
+    await session.commit()
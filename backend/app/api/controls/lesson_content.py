@@ -1,72 +1,81 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
 
-from app.core.database import get_async_session
+from app.core.cache import get_cache_raw, set_cache_raw
+from app.core.database import get_async_session, get_read_session
 from app.api.users.auth import current_active_user
 from app.api.deps import is_staff
 from app.models.users.users import User
 from app.models.controls.lessons import Lesson
-from app.models.controls.section import Section
-from app.models.controls.block import Block
-from app.schemas.controls.lesson_full import LessonFullResponse, SectionFullResponse
-from app.api.controls.block import block_to_response  # переюзовуємо серіалізацію блоку
+from app.schemas.controls.lesson_full import LessonFullResponse
+from app.api.controls.block import lesson_tree_options, lesson_to_response  # серіалізація дерева уроку
 
 router = APIRouter(prefix="/lesson-content", tags=["Lesson Content"])
 
+# старі версії просто вигасають: нова версія = новий ключ
+LESSON_FULL_TTL = 24 * 3600
+
+
+def _etag(lesson_id: int, version: int, audience: str) -> str:
+    return f'"lesson-{lesson_id}-v{version}-{audience}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return etag in tags
+
+
+async def _build_full_lesson(session: AsyncSession, lesson_id: int, staff: bool) -> str | None:
+    """Збирає повний урок потрібної аудиторії й одразу серіалізує в JSON-рядок."""
+    result = await session.execute(
+        select(Lesson).where(Lesson.id == lesson_id).options(lesson_tree_options(staff))
+    )
+    lesson = result.scalar_one_or_none()
+    if not lesson:
+        return None
+    return lesson_to_response(lesson, include_answers=staff).model_dump_json()
+
 
 @router.get("/{lesson_id}/full", response_model=LessonFullResponse)
 async def get_full_lesson(
     lesson_id: int,
-    session: AsyncSession = Depends(get_async_session),
+    request: Request,
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(current_active_user),
 ):
     """Повертає урок із секціями, блоками й питаннями (для сторінки заняття).
 
     Для не-персоналу (учнів) ховаємо правильні відповіді й пояснення.
+    Готовий JSON кешується в Redis на (урок, content_version, аудиторія) і віддається
+    з ETag — повторне відкриття з If-None-Match отримує 304 без тіла.
     """
-    result = await session.execute(
-        select(Lesson)
-        .where(Lesson.id == lesson_id)
-        .options(
-            selectinload(Lesson.lesson_sections)
-            .selectinload(Section.blocks)
-            .selectinload(Block.questions)
-        )
-    )
-    lesson = result.scalar_one_or_none()
-    if not lesson:
+    version = (
+        await session.execute(select(Lesson.content_version).where(Lesson.id == lesson_id))
+    ).scalar_one_or_none()
+    if version is None:
         raise HTTPException(status_code=404, detail="Lesson not found")
 
-    sections = sorted(lesson.lesson_sections, key=lambda s: s.order)
-    section_responses = []
-    for s in sections:
-        blocks = sorted(s.blocks, key=lambda b: b.order)
-        section_responses.append(
-            SectionFullResponse(
-                id=s.id,
-                lesson_id=s.lesson_id,
-                title=s.title,
-                kind=s.kind,
-                icon=s.icon,
-                order=s.order,
-                blocks=[block_to_response(b) for b in blocks],
-            )
-        )
-
-    # учням не віддаємо правильні відповіді / пояснення
-    if not is_staff(current_user):
-        for s in section_responses:
-            for b in s.blocks:
-                for q in b.questions:
-                    q.correct_answer = None
-                    q.explanation = None
-
-    return LessonFullResponse(
-        id=lesson.id,
-        title=lesson.title,
-        level=lesson.level,
-        lesson_type=lesson.lesson_type,
-        sections=section_responses,
-    )
\ No newline at end of file
+    staff = is_staff(current_user)
+    audience = "staff" if staff else "student"
+    etag = _etag(lesson_id, version, audience)
+    # private: відповідь залежить від ролі; no-cache: браузер завжди ревалідує по ETag
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    cache_key = f"lesson_full:{lesson_id}:{version}:{audience}"
+    body = await get_cache_raw(cache_key)
+    if body is None:
+        body = await _build_full_lesson(session, lesson_id, staff)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Lesson not found")
+        await set_cache_raw(cache_key, body, ttl=LESSON_FULL_TTL)
+
+    # Response напряму — FastAPI не проганяє тіло повторно через response_model
+    return Response(content=body, media_type="application/json", headers=headers)
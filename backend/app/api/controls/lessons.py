@@ -62,6 +62,8 @@ async def update_lesson(
 
     for key, value in lesson_data.dict(exclude_unset=True).items():
         setattr(lesson, key, value)
+    # назва/рівень входять у кешований повний урок
+    lesson.content_version = Lesson.content_version + 1
 
     await session.commit()
     await session.refresh(lesson)
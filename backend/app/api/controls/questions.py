@@ -7,6 +7,8 @@ from app.models.controls.questions import Question
 from app.schemas.controls.questions import QuestionCreate, QuestionUpdate, QuestionResponse
 from app.models.controls.universal_task import UniversalTask
 from app.models.controls.task_result import TaskResult
+from app.utils.answer_key import lesson_id_for_block
+from app.utils.lesson_content import bump_content_version
 from fastapi import Response  # якщо ще не імпортовано
 from sqlalchemy import delete  # <— ОЦЕ ГОЛОВНЕ
 
@@ -119,6 +121,12 @@ async def update_question(
         else:
             setattr(question, key, value)
 
+    lesson_id = (
+        await lesson_id_for_block(session, question.block_id)
+        if question.block_id is not None
+        else None
+    )
+    await bump_content_version(session, lesson_id)
     await session.commit()
     await session.refresh(question)
 
@@ -145,7 +153,13 @@ async def delete_question(question_id: int, session: AsyncSession = Depends(get_
     await session.execute(delete(TaskResult).where(TaskResult.question_id == question_id))
 
     # 3) Видалити саме питання
+    lesson_id = (
+        await lesson_id_for_block(session, question.block_id)
+        if question.block_id is not None
+        else None
+    )
     await session.delete(question)
+    await bump_content_version(session, lesson_id)
     await session.commit()
 
     # 204 — без тіла
@@ -9,6 +9,7 @@ from app.api.deps import require_staff
 from app.models.users.users import User
 from app.models.controls.lessons import Lesson
 from app.models.controls.section import Section
+from app.utils.lesson_content import bump_content_version
 from app.schemas.controls.section import SectionCreate, SectionUpdate, SectionResponse
 
 router = APIRouter(prefix="/sections", tags=["Sections"])
@@ -28,6 +29,7 @@ async def create_section(
 
     section = Section(**data.model_dump())
     session.add(section)
+    await bump_content_version(session, data.lesson_id)
     await session.commit()
     await session.refresh(section)
     return section
@@ -61,6 +63,7 @@ async def update_section(
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(section, key, value)
 
+    await bump_content_version(session, section.lesson_id)
     await session.commit()
     await session.refresh(section)
     return section
@@ -79,4 +82,5 @@ async def delete_section(
         raise HTTPException(status_code=404, detail="Section not found")
 
     await session.delete(section)
-    await session.commit()
\ No newline at end of file
+    await bump_content_version(session, section.lesson_id)
+    await session.commit()
@@ -10,20 +10,19 @@ from app.models.controls.universal_task import UniversalTask
 from app.schemas.controls.task_result import TaskResultCreate, TaskResultUpdate, TaskResultResponse
 from app.models.users.users import User
 from datetime import datetime
+from app.utils import grading
 
 router = APIRouter(prefix="/results", tags=["Task Results"])
 
-# 🎯 Автоматична перевірка завдання
-def check_answer(task_type: str, student_answer: str, correct_answer: str | None) -> (bool | None, float):
-    if task_type == "true_false":
-        return student_answer.lower() == correct_answer.lower(), 1.0
-    elif task_type == "multiple_choice":
-        return student_answer in correct_answer.split(","), 1.0
-    elif task_type == "gap_fill":
-        return student_answer.strip() == correct_answer.strip(), 1.0
-    elif task_type == "open_text":
-        return None, 0.0  # not manual check
-    return None, 0.0
+# 🎯 Автоматична перевірка завдання — той самий рушій, що й у спробах уроків
+def check_answer(
+    task_type: str, student_answer: str, correct_answer: str | None, options: dict | None = None
+) -> tuple[bool | None, float]:
+    key = grading.compile_key(task_type, correct_answer, options)
+    score = grading.grade(task_type, key, student_answer)
+    if score is None:
+        return None, 0.0  # ручна перевірка
+    return grading.is_correct(score), score
 
 
 # 📊 Перевірити тест і зберегти результат
@@ -48,7 +47,9 @@ async def check_task_results(
             raise HTTPException(status_code=404, detail=f"Question {question_id} not found")
 
         # Перевіряємо відповідь
-        is_correct, score = check_answer(task.task_type, student_answer, question.correct_answer)
+        is_correct, score = check_answer(
+            task.task_type, student_answer, question.correct_answer, question.options
+        )
 
         new_result = TaskResult(
             task_id=task_id,
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import require_staff
+from app.core.cache import cache_stats
+from app.core.database import engine, pool_stats, read_engine
+from app.core.ws_outbox import outbox_stats
+
+# Службові метрики воркера (кожен воркер відповідає лише за себе)
+router = APIRouter(prefix="/internal", tags=["Internal"], dependencies=[Depends(require_staff)])
+
+
+@router.get("/ws-queues")
+async def ws_queues():
+    """Черги відправки WebSocket по хабах: відкриті, глибина, відкинуті/відключені."""
+    return outbox_stats()
+
+
+@router.get("/db-pool")
+async def db_pool():
+    """Пул зʼєднань з БД: розмір, зайняті, overflow, очікувачі (і пул репліки, якщо є)."""
+    stats = pool_stats(engine)
+    if read_engine is not engine:
+        stats["replica"] = pool_stats(read_engine)
+    return stats
+
+
+@router.get("/cache")
+async def cache():
+    """Кеш: заповненість L1 і влучання L1 / Redis / промахи за префіксами ключів."""
+    return cache_stats()
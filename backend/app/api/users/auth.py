@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Dict, Optional
 from fastapi import Depends, HTTPException, status, Request
 from fastapi_users import BaseUserManager, FastAPIUsers
 from fastapi_users.authentication import AuthenticationBackend, BearerTransport, JWTStrategy
@@ -11,6 +11,7 @@ from passlib.context import CryptContext
 from app.core.database import get_user_db
 from app.models.users.users import User
 from app.core.config import settings
+from app.api.connection.ws_auth import invalidate_user_snapshot
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # 🔑 Конфігурація паролів
@@ -38,6 +39,12 @@ class UserManager(BaseUserManager[User, int]):  # ✅ Використовуєм
 
     async def on_after_request_verify(self, user: User, token: str, request: Optional[Request] = None):
         print(f"Verification requested for user {user.id}. Verification token: {token}")
+
+    async def on_after_update(self, user: User, update_dict: Dict[str, Any], request: Optional[Request] = None):
+        await invalidate_user_snapshot(user.id)
+
+    async def on_after_delete(self, user: User, request: Optional[Request] = None):
+        await invalidate_user_snapshot(user.id)
     
     def parse_id(self, user_id: str) -> int:  
         return int(user_id)
@@ -7,6 +7,7 @@ from app.models.users.users import User
 from app.schemas.users.staff import StaffCreate, StaffUpdate, StaffResponse
 from app.api.users.auth import current_active_user
 from app.core.cache import get_cache, set_cache, delete_cache
+from app.api.connection.ws_auth import invalidate_user_snapshot
 from app.api.users.auth import get_user_manager, UserManager
 import logging
 import os
@@ -137,6 +138,7 @@ async def update_staff(
 
     staff_response = StaffResponse.model_validate(existing_staff.__dict__)
 
+    await invalidate_user_snapshot(staff_id)
     cache_key = f"users:{staff_id}"
     await set_cache(cache_key, staff_response.model_dump(), ttl=1800)
 
@@ -160,6 +162,7 @@ async def delete_staff(
     await session.delete(staff)
     await session.commit()
 
+    await invalidate_user_snapshot(staff_id)
     cache_key = f"users:{staff_id}"
     await delete_cache(cache_key)
 
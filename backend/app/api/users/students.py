@@ -9,6 +9,7 @@ from app.schemas.users.students import (
 )
 from app.api.users.auth import current_active_user, get_user_manager, UserManager
 from app.core.cache import get_cache, set_cache, delete_cache
+from app.api.connection.ws_auth import invalidate_user_snapshot
 import os
 
 
@@ -140,6 +141,7 @@ async def update_student(
 
     student_response = StudentResponse.model_validate(existing_student.__dict__)
 
+    await invalidate_user_snapshot(student_id)
     cache_key = f"users:{student_id}"
     await set_cache(cache_key, student_response.model_dump(), ttl=1800)
 
@@ -240,6 +242,7 @@ async def delete_student(
     await session.delete(student)
     await session.commit()
 
+    await invalidate_user_snapshot(student_id)
     cache_key = f"users:{student_id}"
     await delete_cache(cache_key)
 
@@ -0,0 +1,138 @@
+"""Брокер повідомлень для WebSocket-хабів (класи, чати, дзвінки).
+
+Кожен воркер тримає лише власні зʼєднання; розсилка йде через канал брокера,
+тож подія з воркера A доходить до клієнтів на воркері B.
+
+  InMemoryBroker — у межах одного процесу (локальна розробка, тести);
+  RedisBroker    — Redis pub/sub через спільний `redis_client`, працює між процесами й хостами.
+
+Обробник отримує повідомлення рядком (зазвичай JSON) і відповідає лише
+за доставку своїм локальним зʼєднанням. Вибір реалізації — `settings.ws_broker`.
+"""
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Set
+
+from app.core.cache import redis_client
+from app.core.config import settings
+
+logger = logging.getLogger("broker")
+
+Handler = Callable[[str], Awaitable[None]]
+
+
+class Broker(ABC):
+    """Спільний інтерфейс: publish у канал, subscribe/unsubscribe локального обробника."""
+
+    def __init__(self):
+        self._handlers: Dict[str, Set[Handler]] = {}
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> int:
+        """Повертає кількість отримувачів (Redis — процесів, in-memory — обробників)."""
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        handlers = self._handlers.setdefault(channel, set())
+        first = not handlers
+        handlers.add(handler)
+        if first:
+            await self._on_first_subscribe(channel)
+
+    async def unsubscribe(self, channel: str, handler: Handler) -> None:
+        handlers = self._handlers.get(channel)
+        if not handlers:
+            return
+        handlers.discard(handler)
+        if not handlers:
+            self._handlers.pop(channel, None)
+            await self._on_last_unsubscribe(channel)
+
+    async def _on_first_subscribe(self, channel: str) -> None:
+        pass
+
+    async def _on_last_unsubscribe(self, channel: str) -> None:
+        pass
+
+    async def _dispatch(self, channel: str, message: str) -> None:
+        for handler in list(self._handlers.get(channel, ())):
+            try:
+                await handler(message)
+            except Exception as e:
+                logger.error(f"[BROKER] handler error on {channel}: {e}")
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        self._handlers.clear()
+
+
+class InMemoryBroker(Broker):
+    async def publish(self, channel: str, message: str) -> int:
+        receivers = len(self._handlers.get(channel, ()))
+        await self._dispatch(channel, message)
+        return receivers
+
+
+class RedisBroker(Broker):
+    """Одне pub/sub-зʼєднання на процес; підписка на канал — поки є хоч один локальний обробник."""
+
+    def __init__(self, client=redis_client):
+        super().__init__()
+        self._client = client
+        self._pubsub = None
+        self._reader: asyncio.Task | None = None
+
+    async def publish(self, channel: str, message: str) -> int:
+        return await self._client.publish(channel, message)
+
+    async def _on_first_subscribe(self, channel: str) -> None:
+        if self._pubsub is None:
+            self._pubsub = self._client.pubsub()
+        await self._pubsub.subscribe(channel)
+        if self._reader is None:
+            self._reader = asyncio.create_task(self._read_loop())
+
+    async def _on_last_unsubscribe(self, channel: str) -> None:
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(channel)
+
+    async def _read_loop(self) -> None:
+        while True:
+            try:
+                msg = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # redis-py сам перепідключиться й відновить підписки на наступному виклику
+                logger.error(f"[BROKER] redis pub/sub error: {e}")
+                await asyncio.sleep(1)
+                continue
+            if msg is not None and msg.get("type") == "message":
+                await self._dispatch(msg["channel"], msg["data"])
+
+    async def stop(self) -> None:
+        await super().stop()
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+
+def create_broker(kind: str | None = None) -> Broker:
+    kind = kind or settings.ws_broker
+    if kind == "memory":
+        return InMemoryBroker()
+    if kind == "redis":
+        return RedisBroker()
+    raise ValueError(f"Unknown ws_broker: {kind}")
+
+
+broker = create_broker()
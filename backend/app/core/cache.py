@@ -1,6 +1,11 @@
 import json
+import logging
+import re
+import time
+import uuid
 import redis.asyncio as redis
-from typing import Optional
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional
 from app.core.config import settings
 from datetime import datetime
 from enum import Enum
@@ -11,6 +16,131 @@ redis_client = redis.from_url(
     decode_responses=True
 )
 
+logger = logging.getLogger("cache")
+
+# ---------- L1: кеш у памʼяті воркера перед Redis ----------
+# Для «гарячих» ключів (settings.cache_l1_prefixes) get_cache не ходить у Redis,
+# поки запис живий у L1 (LRU, не довше cache_l1_ttl). Зберігаємо серіалізований рядок —
+# кожен get_cache повертає новий обʼєкт, тож зміни викликача не псують кеш.
+# set_cache/delete_cache розсилають ключ іншим воркерам через брокер (канал INVALIDATION_CHANNEL).
+INVALIDATION_CHANNEL = "cache:invalidate"
+_WORKER_ID = uuid.uuid4().hex
+
+_l1: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+_l1_prefixes = tuple(p.strip() for p in settings.cache_l1_prefixes.split(",") if p.strip())
+# лічильник інвалідацій: читання з Redis, під час якого ключі змінювались, у L1 не кладемо
+_epoch = 0
+_broker = None
+_KEY_NUMBER = re.compile(r"\d+")
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"l1_hits": 0, "redis_hits": 0, "misses": 0})
+
+
+def key_prefix(key: str) -> str:
+    """Форма ключа для лічильників: users:5 -> users:{id}, classroom_7_progress -> classroom_{id}_progress.
+    Числа (id, версії) замінюємо, щоб кількість записів у _stats не росла з кількістю обʼєктів."""
+    return _KEY_NUMBER.sub("{id}", key)
+
+
+def _use_l1(key: str) -> bool:
+    return settings.cache_l1_max_items > 0 and key.startswith(_l1_prefixes)
+
+
+def _l1_get(key: str) -> Optional[str]:
+    item = _l1.get(key)
+    if item is None:
+        return None
+    expires, value = item
+    if expires < time.monotonic():
+        _l1.pop(key, None)
+        return None
+    _l1.move_to_end(key)
+    return value
+
+
+def _l1_set(key: str, value: str, ttl: Optional[int]) -> None:
+    l1_ttl = min(ttl, settings.cache_l1_ttl) if ttl else settings.cache_l1_ttl
+    _l1[key] = (time.monotonic() + l1_ttl, value)
+    _l1.move_to_end(key)
+    while len(_l1) > settings.cache_l1_max_items:
+        _l1.popitem(last=False)
+
+
+async def _publish_invalidation(key: str) -> None:
+    if _broker is None:
+        return
+    try:
+        await _broker.publish(INVALIDATION_CHANNEL, f"{_WORKER_ID} {key}")
+    except Exception as e:
+        logger.warning(f"[CACHE] invalidation publish failed for {key}: {e}")
+
+
+async def _on_invalidation(message: str) -> None:
+    global _epoch
+    origin, _, key = message.partition(" ")
+    if origin != _WORKER_ID:
+        _epoch += 1
+        _l1.pop(key, None)
+
+
+async def start_cache_invalidation(broker) -> None:
+    """Підписка на інвалідації інших воркерів (lifespan, після broker.start())."""
+    global _broker
+    _broker = broker
+    await broker.subscribe(INVALIDATION_CHANNEL, _on_invalidation)
+
+
+async def stop_cache_invalidation() -> None:
+    global _broker
+    if _broker is not None:
+        await _broker.unsubscribe(INVALIDATION_CHANNEL, _on_invalidation)
+        _broker = None
+
+
+async def _get_str(key: str) -> Optional[str]:
+    stats = _stats[key_prefix(key)]
+    l1 = _use_l1(key)
+    if l1:
+        value = _l1_get(key)
+        if value is not None:
+            stats["l1_hits"] += 1
+            return value
+    epoch = _epoch
+    value = await redis_client.get(key)
+    if value is None:
+        stats["misses"] += 1
+        return None
+    stats["redis_hits"] += 1
+    if l1 and epoch == _epoch:
+        _l1_set(key, value, None)
+    return value
+
+
+async def _set_str(key: str, value: str, ttl: Optional[int]) -> None:
+    global _epoch
+    await redis_client.set(key, value, ex=ttl)
+    if _use_l1(key):
+        _epoch += 1
+        _l1_set(key, value, ttl)
+        await _publish_invalidation(key)
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Влучання L1 / Redis і промахи за префіксами ключів (цей воркер)."""
+    prefixes = {}
+    for prefix, s in sorted(_stats.items()):
+        total = s["l1_hits"] + s["redis_hits"] + s["misses"]
+        prefixes[prefix] = {
+            **s,
+            "l1_hit_ratio": round(s["l1_hits"] / total, 3) if total else None,
+        }
+    return {
+        "l1_items": len(_l1),
+        "l1_max_items": settings.cache_l1_max_items,
+        "l1_prefixes": list(_l1_prefixes),
+        "prefixes": prefixes,
+    }
+
+
 def custom_serializer(obj):
     """
     Функція для серіалізації нестандартних типів:
@@ -41,20 +171,35 @@ async def set_cache(key: str, value: dict, ttl: Optional[int] = 3600):
     Зберігає дані у Redis із TTL (часом життя у секундах).
     """
     serialized_value = json.dumps(value, default=custom_serializer)  # ✅ Використовуємо кастомний серіалізатор
-    await redis_client.set(key, serialized_value, ex=ttl)
+    await _set_str(key, serialized_value, ttl)
 
 async def get_cache(key: str) -> Optional[dict]:
     """
-    Отримує дані з Redis і десеріалізує їх.
+    Отримує дані з L1 або Redis і десеріалізує їх.
     """
-    value = await redis_client.get(key)
+    value = await _get_str(key)
     return json.loads(value, object_hook=custom_deserializer) if value else None
 
+async def set_cache_raw(key: str, value: str, ttl: Optional[int] = 3600):
+    """
+    Зберігає вже серіалізований рядок (напр. готовий JSON відповіді) без повторного кодування.
+    """
+    await _set_str(key, value, ttl)
+
+async def get_cache_raw(key: str) -> Optional[str]:
+    """
+    Повертає рядок із L1 або Redis як є, без json.loads.
+    """
+    return await _get_str(key)
+
 # 📊 Видалення значення з Redis
 async def delete_cache(key: str):
     """
-    Видаляє дані з Redis.
+    Видаляє дані з Redis і з L1 усіх воркерів.
     """
+    global _epoch
     await redis_client.delete(key)
-
-
+    if _use_l1(key):
+        _epoch += 1
+        _l1.pop(key, None)
+        await _publish_invalidation(key)
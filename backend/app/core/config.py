@@ -3,6 +3,8 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     database_url: str
+    # репліка лише для читання; порожньо — усе читаємо з primary
+    database_read_url: str = ""
     redis_url: str
     secret_key: str
     algorithm: str = "HS256"
@@ -13,6 +15,27 @@ class Settings(BaseSettings):
     LIVEKIT_API_KEY: str = ""
     LIVEKIT_API_SECRET: str = ""
     
+    # пул зʼєднань з БД (на кожен воркер); echo — лог кожного SQL, лише для налагодження
+    db_echo: bool = False
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30      # сек очікування вільного зʼєднання
+    db_pool_recycle: int = 1800      # сек; старші зʼєднання перевідкриваються
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0  # 0 — без обмеження
+    db_statement_cache_size: int = 100  # 0 — за pgbouncer у transaction-режимі
+    db_read_your_writes_seconds: int = 10  # після запису читання користувача — з primary
+
+    # L1-кеш у памʼяті воркера перед Redis: лише для ключів з цими префіксами
+    cache_l1_prefixes: str = "classroom_,task:,users:,ws_user:,lesson_full:,answer_key:"
+    cache_l1_max_items: int = 5000    # 0 — вимкнено
+    cache_l1_ttl: int = 30            # сек; верхня межа життя запису в L1
+
+    # брокер WebSocket-розсилки: redis — між воркерами/хостами, memory — один процес
+    ws_broker: str = "redis"
+    # write-behind для чату: повідомлення розсилається одразу, у БД пишеться пачками
+    chat_write_behind: bool = False
+
     log_level: str = "info"
     environment: str = "development"
 
@@ -1,23 +1,68 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
-from fastapi import Depends
+from typing import Any, AsyncGenerator, Dict
+from fastapi import Depends, Request
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
 from app.core.config import settings
+from app.core.db_routing import wants_primary
 
 Base = declarative_base()
 
+
+def _connect_args() -> Dict[str, Any]:
+    args: Dict[str, Any] = {
+        # кеш підготовлених запитів: asyncpg і обгортка SQLAlchemy над ним
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+    }
+    if settings.db_statement_timeout_ms:
+        args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+    return args
+
+
+def _create_engine(url: str):
+    return create_async_engine(
+        url,
+        echo=settings.db_echo,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=_connect_args(),
+    )
+
+
 # Ініціалізація двигуна бази даних
-engine = create_async_engine(
-    settings.database_url,
-    echo=True
-)
+engine = _create_engine(settings.database_url)
+# репліка для читання; якщо не задана — той самий primary
+read_engine = _create_engine(settings.database_read_url) if settings.database_read_url else engine
 
 # Налаштування фабрики сесій
 async_session_maker = async_sessionmaker(
     bind=engine,
     expire_on_commit=False
 )
+read_session_maker = async_sessionmaker(
+    bind=read_engine,
+    expire_on_commit=False
+)
+
+def pool_stats(engine=engine) -> Dict[str, Any]:
+    """Стан пулу цього воркера: зайняті зʼєднання, overflow і корутини в черзі на зʼєднання."""
+    pool = engine.sync_engine.pool
+    # публічного лічильника очікувачів немає — беремо з asyncio.Queue всередині пулу
+    queue = getattr(getattr(pool, "_pool", None), "_queue", None)
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+        "waiters": len(getattr(queue, "_getters", ()) or ()),
+        "timeout": pool.timeout(),
+    }
+
 
 # Функція для створення таблиць
 async def get_db_and_tables():
@@ -29,6 +74,15 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
 
+# Сесія для GET-маршрутів, яким підходить репліка (може трохи відставати).
+# Користувач, що щойно писав, читає з primary — див. app/core/db_routing.py
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    maker = async_session_maker
+    if read_engine is not engine and not await wants_primary(request.headers.get("authorization")):
+        maker = read_session_maker
+    async with maker() as session:
+        yield session
+
 # ✅ Виправлений get_user_db (перенесений імпорт всередину)
 async def get_user_db(session: AsyncSession = Depends(get_async_session)):
     from app.models.users.users import User  # 👈 Імпортуємо тут, щоб уникнути циклу
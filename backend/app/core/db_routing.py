@@ -0,0 +1,91 @@
+"""Read-your-writes для читання з репліки.
+
+Після запису (успішний не-GET запит або автозбереження відповіді з WebSocket)
+користувач на db_read_your_writes_seconds «прилипає» до primary: його читання через
+get_read_session ідуть у primary, доки репліка не наздожене. Мітка — ключ у Redis
+(видно всім воркерам) плюс локальна копія, щоб не писати в Redis на кожне збереження.
+
+Користувача визначаємо з Bearer-токена без походу в БД. Без токена або при збої Redis —
+читаємо з primary (надійніше, ніж віддати застарілі дані).
+"""
+import logging
+import time
+
+from jose import JWTError, jwt
+
+from app.core.cache import redis_client
+from app.core.config import settings
+
+logger = logging.getLogger("db_routing")
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# user_id -> момент (monotonic), до якого читаємо з primary
+_local_marks: dict[int, float] = {}
+
+
+def _key(user_id: int) -> str:
+    return f"db_primary:{user_id}"
+
+
+def user_id_from_authorization(value: str | None) -> int | None:
+    if not value or not value.lower().startswith("bearer "):
+        return None
+    try:
+        payload = jwt.decode(
+            value[7:],
+            settings.secret_key,
+            algorithms=[settings.algorithm],
+            options={"verify_aud": False},
+        )
+        return int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
+        return None
+
+
+async def mark_recent_write(user_id: int) -> None:
+    """Наступні db_read_your_writes_seconds читання користувача — з primary."""
+    window = settings.db_read_your_writes_seconds
+    now = time.monotonic()
+    # у Redis пишемо не частіше, ніж раз на пів вікна
+    if _local_marks.get(user_id, 0) - now > window / 2:
+        return
+    _local_marks[user_id] = now + window
+    try:
+        await redis_client.set(_key(user_id), 1, ex=window)
+    except Exception as e:
+        logger.warning(f"[DB ROUTING] failed to mark write for user {user_id}: {e}")
+
+
+async def wants_primary(authorization: str | None) -> bool:
+    user_id = user_id_from_authorization(authorization)
+    if user_id is None:
+        return True
+    if _local_marks.get(user_id, 0) > time.monotonic():
+        return True
+    try:
+        return bool(await redis_client.exists(_key(user_id)))
+    except Exception:
+        return True
+
+
+class ReadYourWritesMiddleware:
+    """ASGI-middleware: після успішного запису ставить мітку користувачу."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message):
+            # мітку ставимо до відповіді: наступний запит клієнта вже піде в primary
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                authorization = dict(scope["headers"]).get(b"authorization")
+                user_id = user_id_from_authorization(authorization.decode() if authorization else None)
+                if user_id is not None:
+                    await mark_recent_write(user_id)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,45 @@
+"""Кодування WebSocket-повідомлень один раз на розсилку.
+
+Payload перетворюється на текст фрейму рівно один раз — у воркера-відправника.
+Через брокер іде «конверт»: рядок JSON-заголовка (кому доставити), перенесення рядка,
+далі вже готовий текст фрейму. Воркери-отримувачі не розбирають і не кодують payload
+повторно, а кладуть той самий рядок у черги всіх адресатів.
+
+orjson використовується, якщо встановлений; інакше — стандартний json. Результат
+однаковий: datetime/date/time — ISO 8601, Enum — його значення, решта — str.
+"""
+import json
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Dict, Tuple
+
+try:
+    import orjson
+except ImportError:  # необовʼязкова залежність
+    orjson = None
+
+
+def _default(obj: Any):
+    # orjson сам пише datetime/Enum саме так; json без цього дав би «2026-01-01 10:00:00»
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    return str(obj)
+
+
+def encode(obj: Any) -> str:
+    """Обʼєкт -> текст фрейму."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default).decode()
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False)
+
+
+def pack(header: Dict[str, Any], frame: str) -> str:
+    """Заголовок + готовий фрейм. JSON без відступів не містить сирих \\n, тож роздільник однозначний."""
+    return encode(header) + "\n" + frame
+
+
+def unpack(raw: str) -> Tuple[Dict[str, Any], str]:
+    header, _, frame = raw.partition("\n")
+    return (orjson.loads(header) if orjson is not None else json.loads(header)), frame
@@ -0,0 +1,98 @@
+"""Кімнати WebSocket поверх брокера.
+
+Hub тримає лише зʼєднання цього воркера (room_id -> список conn-словників)
+і підписаний на канал брокера `<name>:<room_id>`, поки в кімнаті є хоч одне локальне зʼєднання.
+`publish` не шле в сокети напряму: подія йде в брокер і повертається в `_deliver`
+кожного воркера, де є учасники кімнати, — зокрема й цього. Payload кодується один раз
+у відправника (app/core/ws_frame.py), усім адресатам іде той самий рядок.
+
+conn — словник з обовʼязковими "id", "ws" і "out" (черга відправки, app/core/ws_outbox.py);
+решта полів (user_id, role, …) на розсуд хабу. Розсилка лише ставить текст у черги — без await на сокетах.
+"""
+import functools
+import uuid
+from typing import Any, Dict, Hashable, Iterable, List
+
+from fastapi import WebSocket
+
+from app.core import ws_frame
+from app.core.broker import Broker, broker as default_broker
+from app.core.ws_outbox import DROP_OLDEST, Outbox
+
+
+class Hub:
+    def __init__(self, name: str, broker: Broker = default_broker, policy: str = DROP_OLDEST):
+        self.name = name
+        self.broker = broker
+        self.policy = policy  # що робити з клієнтом, що не встигає читати
+        self.rooms: Dict[Hashable, List[Dict[str, Any]]] = {}
+        # обробник брокера на кімнату (той самий обʼєкт потрібен для unsubscribe)
+        self._handlers: Dict[Hashable, Any] = {}
+
+    def channel(self, room_id: Hashable) -> str:
+        return f"{self.name}:{room_id}"
+
+    def new_conn(self, websocket: WebSocket, **fields) -> Dict[str, Any]:
+        out = Outbox(websocket, self.name, policy=self.policy)
+        return {"id": uuid.uuid4().hex, "ws": websocket, "out": out, **fields}
+
+    def local(self, room_id: Hashable) -> List[Dict[str, Any]]:
+        return self.rooms.get(room_id, [])
+
+    async def join(self, room_id: Hashable, conn: Dict[str, Any]) -> None:
+        self.rooms.setdefault(room_id, []).append(conn)
+        if room_id not in self._handlers:
+            handler = functools.partial(self._deliver, room_id)
+            self._handlers[room_id] = handler
+            await self.broker.subscribe(self.channel(room_id), handler)
+
+    async def leave(self, room_id: Hashable, websocket: WebSocket) -> None:
+        room = self.rooms.get(room_id)
+        if not room:
+            return
+        self.rooms[room_id] = [c for c in room if c["ws"] is not websocket]
+        for c in room:
+            if c["ws"] is websocket:
+                await c["out"].close()
+        if not self.rooms[room_id]:
+            self.rooms.pop(room_id, None)
+            handler = self._handlers.pop(room_id, None)
+            if handler is not None:
+                await self.broker.unsubscribe(self.channel(room_id), handler)
+
+    async def publish(
+        self,
+        room_id: Hashable,
+        payload: Dict[str, Any],
+        *,
+        exclude: str | None = None,
+        roles: Iterable[str] | None = None,
+    ) -> None:
+        """Подія всім учасникам кімнати на всіх воркерах.
+
+        exclude — id зʼєднання-відправника; roles — доставити лише conn з такою "role".
+        """
+        await self.publish_frame(room_id, ws_frame.encode(payload), exclude=exclude, roles=roles)
+
+    async def publish_frame(
+        self,
+        room_id: Hashable,
+        frame: str,
+        *,
+        exclude: str | None = None,
+        roles: Iterable[str] | None = None,
+    ) -> None:
+        """Те саме, що publish, для вже закодованого фрейму."""
+        header = {"exclude": exclude, "roles": sorted(roles) if roles is not None else None}
+        await self.broker.publish(self.channel(room_id), ws_frame.pack(header, frame))
+
+    async def _deliver(self, room_id: Hashable, raw: str) -> None:
+        header, text = ws_frame.unpack(raw)
+        exclude = header.get("exclude")
+        roles = header.get("roles")
+        for c in self.local(room_id):
+            if exclude is not None and c["id"] == exclude:
+                continue
+            if roles is not None and c.get("role") not in roles:
+                continue
+            c["out"].send(text)
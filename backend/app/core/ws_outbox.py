@@ -0,0 +1,116 @@
+"""Черга вихідних повідомлень на кожен WebSocket.
+
+Розсилка лише кладе текст у обмежену чергу зʼєднання (send — без await),
+а окрема задача-писар для кожного сокета викачує її в `send_text`.
+Один повільний клієнт більше не гальмує доставку решті кімнати.
+
+Коли черга заповнена, діє політика:
+  drop_oldest — викидаємо найстаріше повідомлення (живі події класу: важливе лише свіже);
+  disconnect  — закриваємо сокет (чат, сигналінг дзвінка: пропуск ламає стан клієнта,
+                а після перепідключення він отримає історію/peers наново).
+Лічильники по кожному хабу — у `outbox_stats()`.
+"""
+import asyncio
+import logging
+import weakref
+from collections import Counter
+from typing import Dict
+
+from fastapi import WebSocket
+
+logger = logging.getLogger("ws_outbox")
+
+SEND_QUEUE_SIZE = 256
+DROP_OLDEST = "drop_oldest"
+DISCONNECT = "disconnect"
+
+_counters: Dict[str, Counter] = {}
+_live: "weakref.WeakSet[Outbox]" = weakref.WeakSet()
+
+
+class Outbox:
+    def __init__(
+        self,
+        websocket: WebSocket,
+        name: str,
+        *,
+        policy: str = DROP_OLDEST,
+        maxsize: int = SEND_QUEUE_SIZE,
+    ):
+        self.ws = websocket
+        self.name = name
+        self.policy = policy
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize)
+        self.closed = False
+        self.stats = _counters.setdefault(name, Counter())
+        self._writer = asyncio.create_task(self._run())
+        _live.add(self)
+
+    def send(self, text: str) -> bool:
+        """Неблокуюче додавання в чергу; False — повідомлення не прийнято."""
+        if self.closed:
+            return False
+        if self.queue.full():
+            if self.policy == DISCONNECT:
+                self.stats["disconnected_slow"] += 1
+                logger.warning(f"[{self.name.upper()} WS] send queue full, disconnecting slow client")
+                self._abort()
+                return False
+            self.queue.get_nowait()
+            self.stats["dropped"] += 1
+        self.queue.put_nowait(text)
+        self.stats["queued"] += 1
+        return True
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                text = await self.queue.get()
+                await self.ws.send_text(text)
+                self.stats["sent"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats["send_errors"] += 1
+            logger.error(f"[{self.name.upper()} WS] send error: {e}")
+            self._abort()
+
+    def _abort(self) -> None:
+        """Закриває сокет; цикл прийому отримає disconnect і сам прибере зʼєднання."""
+        if self.closed:
+            return
+        self.closed = True
+        asyncio.create_task(self._close_ws())
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+    async def _close_ws(self) -> None:
+        try:
+            await self.ws.close()
+        except Exception:
+            pass
+
+    async def close(self) -> None:
+        """Зупиняє писаря (сокет уже закрито або закривається викликачем)."""
+        self.closed = True
+        if not self._writer.done():
+            self._writer.cancel()
+            try:
+                await self._writer
+            except (asyncio.CancelledError, Exception):
+                pass
+        _live.discard(self)
+
+
+def outbox_stats() -> Dict[str, Dict[str, int]]:
+    """Лічильники й поточна глибина черг по хабах (лише цей воркер)."""
+    out: Dict[str, Dict[str, int]] = {
+        name: {"open": 0, "depth": 0, "max_depth": 0, **counter} for name, counter in _counters.items()
+    }
+    for box in list(_live):
+        entry = out.setdefault(box.name, {"open": 0, "depth": 0, "max_depth": 0})
+        depth = box.queue.qsize()
+        entry["open"] += 1
+        entry["depth"] += depth
+        entry["max_depth"] = max(entry["max_depth"], depth)
+    return out
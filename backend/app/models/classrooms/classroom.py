@@ -10,10 +10,10 @@ class Classroom(Base):
     name = Column(String, nullable=False)
     type = Column(String, nullable=False)  # group / individual
     description = Column(String, nullable=True)
-    current_lesson_id = Column(Integer, ForeignKey("lessons.id"), nullable=True)
+    current_lesson_id = Column(Integer, ForeignKey("lessons.id"), index=True, nullable=True)
 
-    teacher_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
-    student_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    teacher_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), index=True, nullable=True)
+    student_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), index=True, nullable=True)
 
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=func.now())
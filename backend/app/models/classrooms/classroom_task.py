@@ -8,9 +8,9 @@ class ClassroomTask(Base):
     __tablename__ = "classroom_tasks"
     
     id = Column(Integer, primary_key=True, index=True)
-    classroom_id = Column(Integer, ForeignKey("classrooms.id"), nullable=False)  # Прив'язка до класу
-    task_id = Column(Integer, ForeignKey("universal_tasks.id"), nullable=False)  # Прив'язка до UniversalTask
-    assigned_by = Column(Integer, ForeignKey("users.id"), nullable=False)  # ✅ Використовуємо users.id
+    classroom_id = Column(Integer, ForeignKey("classrooms.id"), index=True, nullable=False)  # Прив'язка до класу
+    task_id = Column(Integer, ForeignKey("universal_tasks.id"), index=True, nullable=False)  # Прив'язка до UniversalTask
+    assigned_by = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)  # ✅ Використовуємо users.id
     is_active = Column(Boolean, default=True)  # Чи активне завдання
 
     # Відносини
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, func
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, DateTime, Boolean, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.users.users import User
@@ -9,7 +9,7 @@ class Call(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     status = Column(String, nullable=False, default="active")  # ✅ Використовуємо string замість Enum
-    classroom_id = Column(Integer, ForeignKey("classrooms.id"), nullable=False)
+    classroom_id = Column(Integer, ForeignKey("classrooms.id"), index=True, nullable=False)
     created_at = Column(DateTime, default=func.now())
 
     # ✅ Відносини
@@ -18,10 +18,13 @@ class Call(Base):
 
 class CallParticipant(Base):
     __tablename__ = "call_participants"
+    __table_args__ = (
+        Index("ix_call_participants_call_user", "call_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     call_id = Column(Integer, ForeignKey("calls.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
     role = Column(String, nullable=False)  # ✅ Використовуємо string ("teacher" або "student") замість Enum
     joined_at = Column(DateTime, default=func.now())
     left_at = Column(DateTime, nullable=True)
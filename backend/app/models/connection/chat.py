@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, Boolean, ForeignKey, DateTime, func
+from sqlalchemy import Column, String, Integer, Text, Boolean, ForeignKey, Index, DateTime, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.users.users import User
@@ -8,16 +8,19 @@ class Chat(Base):
     __tablename__ = "chats"
     
     id = Column(Integer, primary_key=True, index=True)
-    classroom_id = Column(Integer, ForeignKey("classrooms.id"), nullable=False)
+    classroom_id = Column(Integer, ForeignKey("classrooms.id"), index=True, nullable=False)
     created_at = Column(DateTime, default=func.now())
 
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_chat_sent", "chat_id", "sent_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     chat_id = Column(Integer, ForeignKey("chats.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # ✅ Використовуємо users.id
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)  # ✅ Використовуємо users.id
     role = Column(String, nullable=False)  
     message = Column(Text, nullable=False)
     sent_at = Column(DateTime, default=func.now())
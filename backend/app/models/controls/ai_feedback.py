@@ -6,7 +6,7 @@ class AIFeedback(Base):
     __tablename__ = "ai_feedback"
 
     id = Column(Integer, primary_key=True, index=True)
-    task_result_id = Column(Integer, ForeignKey("task_results.id"), nullable=False)  # Прив'язка до TaskResult
+    task_result_id = Column(Integer, ForeignKey("task_results.id"), index=True, nullable=False)  # Прив'язка до TaskResult
     feedback_text = Column(Text, nullable=False)  # Загальний фідбек
     detailed_feedback = Column(Text, nullable=True)  # Детальний фідбек для WRITING
     created_at = Column(DateTime, default=func.now())  # Час створення
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, Boolean, Float, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, Text, Boolean, Float, ForeignKey, DateTime, Index, func, text
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -8,13 +8,35 @@ class Answer(Base):
 
     Містить і бот-перевірку (is_correct / bot_score), і оцінку вчителя
     (teacher_grade / teacher_feedback). Сюди ж зберігаються «живі» відповіді при сдачі.
+
+    Одна відповідь на (attempt, block, question) гарантується двома частковими
+    унікальними індексами (окремо для question_id IS NULL), по них і йде upsert.
+    Тому при видаленні питання його відповіді видаляються (CASCADE), а не обнуляються:
+    SET NULL зіткнувся б з уже наявною відповіддю блоку без питання.
     """
     __tablename__ = "answers"
+    __table_args__ = (
+        Index(
+            "uq_answers_attempt_block_question",
+            "attempt_id",
+            "block_id",
+            "question_id",
+            unique=True,
+            postgresql_where=text("question_id IS NOT NULL"),
+        ),
+        Index(
+            "uq_answers_attempt_block_no_question",
+            "attempt_id",
+            "block_id",
+            unique=True,
+            postgresql_where=text("question_id IS NULL"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    attempt_id = Column(Integer, ForeignKey("lesson_attempts.id", ondelete="CASCADE"), nullable=False)
-    block_id = Column(Integer, ForeignKey("blocks.id", ondelete="CASCADE"), nullable=False)
-    question_id = Column(Integer, ForeignKey("questions.id", ondelete="SET NULL"), nullable=True)
+    attempt_id = Column(Integer, ForeignKey("lesson_attempts.id", ondelete="CASCADE"), index=True, nullable=False)
+    block_id = Column(Integer, ForeignKey("blocks.id", ondelete="CASCADE"), index=True, nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), index=True, nullable=True)
 
     student_answer = Column(Text, nullable=True)
     is_correct = Column(Boolean, nullable=True)    # бот-перевірка
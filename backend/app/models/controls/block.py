@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -8,6 +9,11 @@ class Block(Base):
     або завдання певного типу (multiple_choice, gap_fill, listening, video, …).
     """
     __tablename__ = "blocks"
+    __table_args__ = (
+        # пошук блоків за ключами/значеннями config без розбору кожного рядка в Python
+        Index("ix_blocks_config_gin", "config", postgresql_using="gin"),
+        Index("ix_blocks_section_order", "section_id", "order"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     section_id = Column(Integer, ForeignKey("sections.id", ondelete="CASCADE"), nullable=False)
@@ -24,7 +30,7 @@ class Block(Base):
     description = Column(Text, nullable=True)
     media_url = Column(String, nullable=True)
     word_list = Column(Text, nullable=True)
-    config = Column(Text, nullable=True)           # JSON: налаштування під конкретний тип завдання
+    config = Column(JSONB(none_as_null=True), nullable=True)  # налаштування під конкретний тип завдання
 
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=func.now())
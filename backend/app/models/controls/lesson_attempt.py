@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, Index, DateTime, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -6,9 +7,14 @@ from app.core.database import Base
 class LessonAttempt(Base):
     """Проходження уроку учнем (сесія/спроба).
 
-    Звідси беруться «пройдені уроки»: статус, час, загальна оцінка вчителя.
+    Звідси беруться «пройдені уроки»: статус, час, загальна оцінка вчителя
+    і збережені при завершенні авто-бали (без читання answers).
     """
     __tablename__ = "lesson_attempts"
+    __table_args__ = (
+        Index("ix_lesson_attempts_student_started", "student_id", "started_at"),
+        Index("ix_lesson_attempts_lesson_student_status", "lesson_id", "student_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     lesson_id = Column(Integer, ForeignKey("lessons.id", ondelete="CASCADE"), nullable=False)
@@ -19,6 +25,13 @@ class LessonAttempt(Base):
     started_at = Column(DateTime, default=func.now())
     completed_at = Column(DateTime, nullable=True)
 
+    # підсумки автоперевірки; рахуються при завершенні (app/utils/attempt_score.py)
+    auto_score = Column(Float, nullable=True)
+    max_auto_score = Column(Float, nullable=True)
+    answered_count = Column(Integer, nullable=True)
+    section_scores = Column(JSONB(none_as_null=True), nullable=True)  # [{section_id, score, max_score, answered}]
+    time_spent_seconds = Column(Integer, nullable=True)
+
     lesson = relationship("Lesson")
     student = relationship("User", foreign_keys=[student_id])
     answers = relationship(
@@ -12,8 +12,10 @@ class Lesson(Base):
     level = Column(String, nullable=True)
     lesson_type = Column(String, nullable=True)  # grammar / speaking / reading / … (стиль уроку)
 
-    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_by = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
     is_active = Column(Boolean, default=True)
+    # лічильник версій вмісту (секції/блоки/питання) — ключ кешу й ETag повного уроку
+    content_version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
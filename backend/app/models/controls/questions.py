@@ -1,20 +1,24 @@
-from sqlalchemy import Column, Integer, Text, ForeignKey
+from sqlalchemy import Column, Integer, Text, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.core.database import Base
-import json
 
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        Index("ix_questions_options_gin", "options", postgresql_using="gin"),
+        Index("ix_questions_block_order", "block_id", "order"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     # Стара прив'язка до UniversalTask (лишаємо для наявних даних, тепер nullable)
-    task_id = Column(Integer, ForeignKey("universal_tasks.id"), nullable=True)
+    task_id = Column(Integer, ForeignKey("universal_tasks.id"), index=True, nullable=True)
     # Нова прив'язка до Block
     block_id = Column(Integer, ForeignKey("blocks.id", ondelete="CASCADE"), nullable=True)
 
     question_text = Column(Text, nullable=False)
-    options = Column(Text, nullable=True)  # JSON
+    options = Column(JSONB(none_as_null=True), nullable=True)
     correct_answer = Column(Text, nullable=True)
     explanation = Column(Text, nullable=True)
     order = Column(Integer, nullable=False)  # порядок у завданні
@@ -23,9 +27,9 @@ class Question(Base):
     block = relationship("Block", back_populates="questions")
 
     def set_options(self, options_dict):
-        """Зберігаємо у форматі JSON."""
-        self.options = json.dumps(options_dict)
+        """JSONB: драйвер сам кодує dict."""
+        self.options = options_dict
 
     def get_options(self):
-        """Дістаємо з JSON у dict."""
-        return json.loads(self.options) if self.options else {}
\ No newline at end of file
+        """JSONB: asyncpg повертає вже розібраний dict."""
+        return self.options or {}
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, DateTime, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -9,6 +9,9 @@ class Section(Base):
     Урок складається з кількох секцій; кожна секція — впорядкована стрічка блоків.
     """
     __tablename__ = "sections"
+    __table_args__ = (
+        Index("ix_sections_lesson_order", "lesson_id", "order"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     lesson_id = Column(Integer, ForeignKey("lessons.id", ondelete="CASCADE"), nullable=False)
@@ -1,15 +1,18 @@
-from sqlalchemy import Column, Integer, Text, Boolean, Float, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, Text, Boolean, Float, ForeignKey, Index, DateTime, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.users.users import User
 
 class TaskResult(Base):
     __tablename__ = "task_results"
+    __table_args__ = (
+        Index("ix_task_results_task_student", "task_id", "student_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(Integer, ForeignKey("universal_tasks.id"), nullable=False)
-    student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    question_id = Column(Integer, ForeignKey("questions.id"), nullable=True)
+    student_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id"), index=True, nullable=True)
     student_answer = Column(Text, nullable=False)
     is_correct = Column(Boolean, nullable=True)
     score = Column(Float, nullable=True)
@@ -28,7 +28,7 @@ class UniversalTask(Base):
     __tablename__ = "universal_tasks"
     
     id = Column(Integer, primary_key=True, index=True)
-    lesson_id = Column(Integer, ForeignKey("lessons.id"), nullable=True)
+    lesson_id = Column(Integer, ForeignKey("lessons.id"), index=True, nullable=True)
     control_type = Column(String, nullable=False)
     task_type = Column(String, nullable=False)
     title = Column(String, nullable=False) # Section name
@@ -38,8 +38,8 @@ class UniversalTask(Base):
     topic = Column(String, nullable=True)
     word_list = Column(Text, nullable=True)
     visibility = Column(String, nullable=False) # For whom tasks are available
-    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
-    classroom_id = Column(Integer, ForeignKey("classrooms.id"), nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    classroom_id = Column(Integer, ForeignKey("classrooms.id"), index=True, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
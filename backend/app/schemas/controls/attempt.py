@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import List
+from typing import Dict, List
 
 
 class AttemptStart(BaseModel):
@@ -32,12 +32,43 @@ class AnswerGrade(BaseModel):
     teacher_feedback: str | None = None
 
 
+class AnswerGradeItem(AnswerGrade):
+    answer_id: int
+
+
+class AnswerGradeBatch(BaseModel):
+    """Пакет оцінок; оновлюються лише передані поля кожного елемента."""
+    grades: List[AnswerGradeItem]
+    recompute_overall: bool = False  # перерахувати overall_grade спроб з відповідей
+
+
+class AnswerGradeBatchResult(BaseModel):
+    answers: List[AnswerResponse] = []
+    overall_grades: Dict[int, float | None] = {}  # attempt_id -> новий overall_grade
+
+
 class AttemptGrade(BaseModel):
     overall_grade: float | None = None
     teacher_comment: str | None = None
 
 
-class AttemptResponse(BaseModel):
+class SectionScore(BaseModel):
+    section_id: int
+    score: float = 0.0
+    max_score: float = 0.0
+    answered: int = 0
+
+
+class AttemptScores(BaseModel):
+    """Підсумки, збережені при завершенні спроби (None — ще не завершена)."""
+    auto_score: float | None = None
+    max_auto_score: float | None = None
+    answered_count: int | None = None
+    section_scores: List[SectionScore] | None = None
+    time_spent_seconds: int | None = None
+
+
+class AttemptResponse(AttemptScores):
     id: int
     lesson_id: int
     student_id: int
@@ -56,7 +87,7 @@ class AttemptFullResponse(AttemptResponse):
     answers: List[AnswerResponse] = []
 
 
-class MyAttemptItem(BaseModel):
+class MyAttemptItem(AttemptScores):
     """Елемент списку «Мої результати» (для учня)."""
     id: int
     lesson_id: int
@@ -64,4 +95,43 @@ class MyAttemptItem(BaseModel):
     status: str
     overall_grade: float | None = None
     started_at: datetime | None = None
-    completed_at: datetime | None = None
\ No newline at end of file
+    completed_at: datetime | None = None
+
+
+# --- матриця оцінювання (учень × питання) ---
+class MatrixCell(BaseModel):
+    student_id: int
+    block_id: int
+    question_id: int | None = None
+    is_correct: bool | None = None
+    bot_score: float | None = None
+    teacher_grade: float | None = None
+
+
+class MatrixStudent(BaseModel):
+    """Агрегати по останній спробі учня."""
+    student_id: int
+    student_username: str | None = None
+    attempt_id: int
+    status: str
+    answered: int = 0
+    correct: int = 0
+    bot_score: float = 0.0
+    teacher_grade_avg: float | None = None
+
+
+class MatrixQuestion(BaseModel):
+    """Агрегати по питанню (або блоку без питань) серед учнів."""
+    block_id: int
+    question_id: int | None = None
+    answered: int = 0
+    correct: int = 0
+    bot_score_avg: float | None = None
+    teacher_grade_avg: float | None = None
+
+
+class AttemptMatrixResponse(BaseModel):
+    lesson_id: int
+    students: List[MatrixStudent] = []
+    questions: List[MatrixQuestion] = []
+    cells: List[MatrixCell] = []
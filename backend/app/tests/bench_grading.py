@@ -0,0 +1,63 @@
+"""Мікробенчмарк рушія перевірки: python -m app.tests.bench_grading
+
+Порівнює перевірку «компілюємо ключ на кожну відповідь» (як стара check_answer)
+з перевіркою спроби одним grade_many по заздалегідь скомпільованих ключах.
+"""
+import random
+import string
+import timeit
+
+from app.utils import grading
+
+ATTEMPT_SIZE = 200
+REPEAT = 200
+
+
+def _word(rng, n=8):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(n))
+
+
+def _attempt(rng):
+    items = []
+    for _ in range(ATTEMPT_SIZE):
+        task_type = rng.choice(sorted(grading.AUTO_TYPES))
+        options = None
+        if task_type == "true_false":
+            correct, answer = "true", rng.choice(["True", "false"])
+        elif task_type == "multiple_choice":
+            options = {k: _word(rng) for k in "ABCD"}
+            correct, answer = "A,C", rng.choice(["A,C", "B", options["A"]])
+        elif task_type == "gap_fill":
+            words = [_word(rng) for _ in range(3)]
+            correct, answer = "||".join(words), "||".join(words[:2] + [_word(rng)])
+        elif task_type == "short_answer":
+            word = _word(rng, 10)
+            correct, answer = f"{word}/{_word(rng)}", word[:-1] + "x"
+        elif task_type == "ordering":
+            words = [_word(rng, 4) for _ in range(5)]
+            correct, answer = ",".join(words), ",".join(reversed(words))
+        else:
+            correct, answer = "1=a,2=b,3=c", "1=a,2=c,3=b"
+        items.append((task_type, correct, options, answer))
+    return items
+
+
+def main():
+    rng = random.Random(42)
+    items = _attempt(rng)
+    compiled = [(t, grading.compile_key(t, c, o), a) for t, c, o, a in items]
+
+    def per_answer():
+        for t, c, o, a in items:
+            grading.grade(t, grading.compile_key(t, c, o), a)
+
+    def batched():
+        grading.grade_many(compiled)
+
+    for name, fn in (("compile+grade per answer", per_answer), ("grade_many, precompiled", batched)):
+        best = min(timeit.repeat(fn, number=REPEAT, repeat=5)) / REPEAT
+        print(f"{name:28s} {best * 1e6:9.1f} µs/attempt  {best * 1e6 / ATTEMPT_SIZE:6.2f} µs/answer")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,38 @@
 import pytest
-from httpx import AsyncClient
-from backend.main import app
-from app.core.database import get_async_session
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+
+from main import app
 from app.core.config import settings
-from app.models import Base
+from app.core.database import Base
+from app import models  # noqa: F401  — реєструє всі моделі на Base.metadata
 
-# Створення тестового двигуна
+# Створення тестового двигуна. NullPool — зʼєднання не переходять між event loop-ами тестів.
+# Без тестової бази тести з БД пропускаються; решта (грейдинг, кеш, сокети) працює на фейках.
 TEST_DATABASE_URL = f"{settings.database_url}_test"
-engine = create_async_engine(TEST_DATABASE_URL, echo=True)
+engine = create_async_engine(TEST_DATABASE_URL, echo=True, poolclass=NullPool)
 TestingSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
 
-@pytest.fixture(scope="session", autouse=True)
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def setup_test_database():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    except (OSError, DBAPIError) as e:
+        pytest.skip(f"test database unavailable: {e}")
     yield
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
-@pytest.fixture
-async def async_client():
-    async with AsyncClient(app=app, base_url="http://testserver") as client:
+@pytest_asyncio.fixture
+async def async_client(setup_test_database):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
         yield client
 
-@pytest.fixture
-async def db_session():
+@pytest_asyncio.fixture
+async def db_session(setup_test_database):
     async with TestingSessionLocal() as session:
         yield session
@@ -0,0 +1,109 @@
+"""Автозбереження: невідомі питання, збій однієї спроби й завершені спроби не гублять інші відповіді.
+
+Запуск: python -m pytest -q app/tests/test_answer_autosave.py
+"""
+from types import MappingProxyType, SimpleNamespace
+
+import pytest
+
+from app.core.broker import InMemoryBroker
+from app.utils import answer_autosave as autosave_module
+from app.utils import grading
+from app.utils.answer_autosave import AnswerAutosave
+from app.utils.answer_key import AnswerKey, QuestionKey
+
+KEY = AnswerKey(
+    lesson_id=1,
+    blocks=MappingProxyType({10: "short_answer"}),
+    questions=MappingProxyType(
+        {100: QuestionKey(10, "short_answer", grading.compile_key("short_answer", "cat"))}
+    ),
+)
+
+
+class FakeSession:
+    def __init__(self, db):
+        self.db = db
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def execute(self, stmt):
+        return SimpleNamespace(scalars=lambda: iter(self.db.open_attempts))
+
+    def begin_nested(self):
+        db = self.db
+
+        class Savepoint:
+            async def __aenter__(self):
+                db.savepoint = []
+
+            async def __aexit__(self, exc_type, *exc):
+                if exc_type is None:
+                    db.saved.extend(db.savepoint)
+                return False
+
+        return Savepoint()
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def db(monkeypatch):
+    state = SimpleNamespace(open_attempts={1, 2}, saved=[], savepoint=[], broken={2})
+
+    async def fake_key(session, lesson_id):
+        return KEY
+
+    async def fake_upsert(session, rows):
+        if any(r["attempt_id"] in state.broken for r in rows):
+            raise RuntimeError("FK violation")
+        state.savepoint.extend(rows)
+
+    monkeypatch.setattr(autosave_module, "async_session_maker", lambda: FakeSession(state))
+    monkeypatch.setattr(autosave_module, "get_answer_key", fake_key)
+    monkeypatch.setattr(autosave_module, "upsert_answers", fake_upsert)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_bad_rows_and_failed_attempts_do_not_drop_others(db):
+    autosave = AnswerAutosave(broker=InMemoryBroker())
+    autosave.put(1, 1, 10, 100, "cat")
+    autosave.put(1, 1, 10, 999, "bogus")   # питання не з цього уроку — відкидається
+    autosave.put(1, 2, 10, 100, "dog")     # спроба, чий запис падає, — у повтор
+    assert await autosave.flush() == 1
+    assert [(r["attempt_id"], r["question_id"], r["bot_score"]) for r in db.saved] == [(1, 100, 1.0)]
+    assert list(autosave._pending) == [(2, 10, 100)]
+
+
+@pytest.mark.asyncio
+async def test_finish_writes_answers_buffered_on_another_worker(db):
+    broker = InMemoryBroker()
+    http_worker, ws_worker = AnswerAutosave(broker=broker), AnswerAutosave(broker=broker)
+    await http_worker.start()
+    await ws_worker.start()
+    try:
+        # учень відповів через сокет і одразу натиснув «Завершити» — запит прийшов на інший воркер
+        ws_worker.put(1, 1, 10, 100, "cat")
+        await http_worker.finish(1)
+
+        assert [(r["attempt_id"], r["student_answer"]) for r in db.saved] == [(1, "cat")]
+        assert ws_worker.pending == 0
+        assert not ws_worker.put(1, 1, 10, 100, "late")
+        assert not http_worker.put(1, 1, 10, 100, "late")
+    finally:
+        await http_worker.stop()
+        await ws_worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_completed_attempt_is_not_written(db):
+    autosave = AnswerAutosave(broker=InMemoryBroker())
+    db.open_attempts = set()   # спроба вже не in_progress
+    autosave.put(1, 1, 10, 100, "cat")
+    assert await autosave.flush() == 0 and db.saved == []
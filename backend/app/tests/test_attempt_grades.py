@@ -0,0 +1,78 @@
+"""Пакетне оцінювання на тестовій базі: оновлюються лише передані поля, overall_grade перераховується.
+
+Пачка лише з відгуками (усі teacher_grade = NULL) — випадок, на якому без CAST у VALUES падав Postgres.
+Запуск: python -m pytest -q app/tests/test_attempt_grades.py (потрібна база <database_url>_test)
+"""
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.future import select
+
+from app.api.controls.attempt import _apply_grades
+from app.models.controls.answer import Answer
+from app.models.controls.block import Block
+from app.models.controls.lesson_attempt import LessonAttempt
+from app.models.controls.lessons import Lesson
+from app.models.controls.section import Section
+from app.models.users.users import User
+from app.schemas.controls.attempt import AnswerGradeBatch, AnswerGradeItem
+
+
+@pytest_asyncio.fixture
+async def graded_attempt(db_session):
+    """Спроба з двома відповідями: одна вже оцінена вчителем, друга — лише ботом."""
+    tag = uuid.uuid4().hex[:8]
+    user = User(
+        email=f"{tag}@example.com", username=tag, phone_number=tag, hashed_password="x", role="student"
+    )
+    db_session.add(user)
+    await db_session.flush()
+    lesson = Lesson(title="Grades", created_by=user.id)
+    db_session.add(lesson)
+    await db_session.flush()
+    section = Section(lesson_id=lesson.id, title="S")
+    db_session.add(section)
+    await db_session.flush()
+    blocks = [Block(section_id=section.id, block_type="task", task_type="writing") for _ in range(2)]
+    db_session.add_all(blocks)
+    attempt = LessonAttempt(lesson_id=lesson.id, student_id=user.id, status="completed")
+    db_session.add(attempt)
+    await db_session.flush()
+    answers = [
+        Answer(attempt_id=attempt.id, block_id=blocks[0].id, student_answer="a", bot_score=1.0, teacher_grade=0.5),
+        Answer(attempt_id=attempt.id, block_id=blocks[1].id, student_answer="b", bot_score=0.25),
+    ]
+    db_session.add_all(answers)
+    await db_session.commit()
+    return attempt.id, [a.id for a in answers]
+
+
+@pytest.mark.asyncio
+async def test_feedback_only_batch_keeps_grades(db_session, graded_attempt):
+    attempt_id, (first, second) = graded_attempt
+    result = await _apply_grades(
+        db_session,
+        AnswerGradeBatch(grades=[
+            AnswerGradeItem(answer_id=first, teacher_feedback="добре"),
+            AnswerGradeItem(answer_id=second, teacher_feedback="ще раз"),
+        ]),
+        attempt_id,
+    )
+    assert {a.id: (a.teacher_grade, a.teacher_feedback) for a in result.answers} == {
+        first: (0.5, "добре"),
+        second: (None, "ще раз"),
+    }
+
+
+@pytest.mark.asyncio
+async def test_grade_batch_recomputes_overall(db_session, graded_attempt):
+    attempt_id, (first, second) = graded_attempt
+    result = await _apply_grades(
+        db_session,
+        AnswerGradeBatch(grades=[AnswerGradeItem(answer_id=second, teacher_grade=0.75)], recompute_overall=True),
+    )
+    # overall = оцінка вчителя, а де її нема — бот-бал: 0.5 + 0.75
+    assert result.overall_grades == {attempt_id: 1.25}
+    feedback = (await db_session.execute(select(Answer.teacher_feedback).where(Answer.id == first))).scalar_one()
+    assert feedback is None
@@ -0,0 +1,105 @@
+"""L1-кеш перед Redis: влучання, ізоляція значень, інвалідація між воркерами.
+
+Запуск: python -m pytest -q app/tests/test_cache_l1.py
+"""
+import pytest
+
+from app.core import cache
+from app.core.broker import InMemoryBroker
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.gets = 0
+
+    async def get(self, key):
+        self.gets += 1
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(cache, "redis_client", fake)
+    cache._l1.clear()
+    cache._stats.clear()
+    yield fake
+    cache._l1.clear()
+
+
+@pytest.mark.asyncio
+async def test_hot_keys_served_from_l1(redis):
+    redis.data["users:1"] = '{"id": 1, "tags": []}'
+    first = await cache.get_cache("users:1")
+    first["tags"].append("changed")  # зміна викликача не псує кеш
+    second = await cache.get_cache("users:1")
+    assert second == {"id": 1, "tags": []}
+    assert redis.gets == 1
+
+    redis.data["feedback:1"] = '{"a": 1}'  # префікс не з L1 — щоразу в Redis
+    await cache.get_cache("feedback:1")
+    await cache.get_cache("feedback:1")
+    assert redis.gets == 3
+
+    stats = cache.cache_stats()["prefixes"]
+    assert stats["users:{id}"]["l1_hits"] == 1 and stats["users:{id}"]["redis_hits"] == 1
+    assert stats["feedback:{id}"]["l1_hits"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stats_group_keys_by_shape(redis):
+    for classroom_id in (7, 8, 9):
+        await cache.get_cache(f"classroom_{classroom_id}_progress")
+    await cache.get_cache("classroom_7")
+
+    stats = cache.cache_stats()["prefixes"]
+    assert set(stats) == {"classroom_{id}_progress", "classroom_{id}"}
+    assert stats["classroom_{id}_progress"]["misses"] == 3
+
+
+@pytest.mark.asyncio
+async def test_invalidation_between_workers(redis):
+    broker = InMemoryBroker()
+    await cache.start_cache_invalidation(broker)
+    published = []
+
+    async def spy(message):
+        published.append(message)
+
+    await broker.subscribe(cache.INVALIDATION_CHANNEL, spy)
+
+    await cache.set_cache("classroom_5", {"name": "A"})
+    assert await cache.get_cache("classroom_5") == {"name": "A"}
+    assert redis.gets == 0  # щойно записане — з L1
+    assert published == [f"{cache._WORKER_ID} classroom_5"]  # сповіщення іншим воркерам
+
+    # інший воркер змінив ключ: Redis уже новий, у нас — повідомлення інвалідації
+    redis.data["classroom_5"] = '{"name": "B"}'
+    await cache._on_invalidation("other-worker classroom_5")
+    assert await cache.get_cache("classroom_5") == {"name": "B"}
+
+    await cache.delete_cache("classroom_5")
+    assert await cache.get_cache("classroom_5") is None
+    await cache.stop_cache_invalidation()
+
+
+@pytest.mark.asyncio
+async def test_read_racing_invalidation_is_not_cached(redis):
+    redis.data["task:1"] = '"old"'
+    original_get = redis.get
+
+    async def slow_get(key):
+        value = await original_get(key)
+        await cache._on_invalidation("other-worker task:1")  # запис стався під час читання
+        return value
+
+    redis.get = slow_get
+    assert await cache.get_cache_raw("task:1") == '"old"'
+    assert "task:1" not in cache._l1
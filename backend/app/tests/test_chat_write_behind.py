@@ -0,0 +1,68 @@
+"""Write-behind чату: рядок видаленого чату не губить повідомлення інших чатів.
+
+Запуск: python -m pytest -q app/tests/test_chat_write_behind.py
+"""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.models.connection.chat import ChatMessage
+from app.utils import chat_write_behind as wb_module
+from app.utils.chat_write_behind import ChatWriteBehind
+
+
+class FakeSession:
+    def __init__(self, db):
+        self.db = db
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def execute(self, stmt, rows):
+        if any(r["chat_id"] in self.db.deleted_chats for r in rows):
+            raise IntegrityError("INSERT INTO chat_messages", {}, Exception("chat_id FK"))
+        self.db.savepoint.extend(rows)
+
+    def begin_nested(self):
+        db = self.db
+
+        class Savepoint:
+            async def __aenter__(self):
+                db.savepoint = []
+
+            async def __aexit__(self, exc_type, *exc):
+                if exc_type is None:
+                    db.saved.extend(db.savepoint)
+                return False
+
+        return Savepoint()
+
+    async def commit(self):
+        pass
+
+
+def _message(message_id: int, chat_id: int) -> ChatMessage:
+    return ChatMessage(
+        id=message_id, chat_id=chat_id, user_id=1, role="student", message="hi",
+        sent_at=datetime.now(timezone.utc), is_read=False,
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_chat_does_not_drop_other_chats(monkeypatch):
+    db = SimpleNamespace(saved=[], savepoint=[], deleted_chats={2})
+    monkeypatch.setattr(wb_module, "async_session_maker", lambda: FakeSession(db))
+    writer = ChatWriteBehind()
+    for message_id, chat_id in ((1, 1), (2, 2), (3, 1)):
+        writer.enqueue(_message(message_id, chat_id))
+
+    writer.start()
+    await writer.stop()
+
+    assert [(r["id"], r["chat_id"]) for r in db.saved] == [(1, 1), (3, 1)]
+    assert all(r["sent_at_utc"].tzinfo is timezone.utc for r in db.saved)
@@ -0,0 +1,166 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import answer_key as answer_key_module
+from app.utils import grading
+from app.utils.answer_key import AnswerKey, QuestionKey, _freeze, get_answer_key
+
+
+ALTERNATIVES = {"alternatives": True}
+
+
+def _grade(task_type, correct, answer, options=None, config=None):
+    return grading.grade(task_type, grading.compile_key(task_type, correct, options, config), answer)
+
+
+def test_true_false_aliases():
+    assert _grade("true_false", "true", "True") == 1.0
+    assert _grade("true_false", "t", "yes") == 1.0
+    assert _grade("true_false", "false", "True") == 0.0
+
+
+def test_multiple_choice_option_key_and_text():
+    options = {"A": "Paris", "B": "London"}
+    assert _grade("multiple_choice", "A", "a", options) == 1.0
+    assert _grade("multiple_choice", "A", "Paris", options) == 1.0
+    assert _grade("multiple_choice", "Paris", "B", options) == 0.0
+
+
+def test_multiple_choice_option_text_with_comma():
+    options = {"A": "Yes, I do", "B": "No, I don't"}
+    assert _grade("multiple_choice", "Yes, I do", "A", options) == 1.0
+    assert _grade("multiple_choice", "Yes, I do", "yes,  i do", options) == 1.0
+    assert _grade("multiple_choice", "Yes, I do", "B", options) == 0.0
+    assert _grade("multiple_choice", "A", "Yes, I do", options) == 1.0
+
+
+def test_multiple_choice_single_choice_with_alternatives():
+    options = {"A": "x", "B": "y", "C": "z"}
+    # без multi_select кілька правильних — це альтернативи одного вибору
+    assert _grade("multiple_choice", "A,B", "B", options) == 1.0
+    assert _grade("multiple_choice", "A,B", "C", options) == 0.0
+    assert _grade("multiple_choice", "A,B", "A,B", options) == 0.0  # обрати все не можна
+
+
+def test_multiple_choice_multi_select():
+    options = {"A": "x", "B": "y", "C": "z", "D": "w"}
+    multi = {"multi_select": True}
+    assert _grade("multiple_choice", "A,B", "B, A", options, multi) == 1.0
+    assert _grade("multiple_choice", "A,B", "A,C", options, multi) == 1 / 3
+    # недобір не вигідніший за майже повну відповідь
+    under = _grade("multiple_choice", "A,B,C", "A", options, multi)
+    near = _grade("multiple_choice", "A,B,C", "A,B,C,D", options, multi)
+    assert under == 1 / 3 and near == 3 / 4 and under < near
+
+
+def test_gap_fill_blanks_and_alternatives():
+    assert _grade("gap_fill", "go/goes||on", "goes||ON", config=ALTERNATIVES) == 1.0
+    assert _grade("gap_fill", "go||on", "go||at") == 0.5
+
+
+def test_slash_is_literal_unless_block_opts_in():
+    # наявний контент: «/» — частина відповіді, точний ключ зараховується
+    assert _grade("short_answer", "and/or", "and/or") == 1.0
+    assert _grade("short_answer", "and/or", "and") == 0.0
+    assert _grade("gap_fill", "1/2||x", "1/2||x") == 1.0
+    assert _grade("gap_fill", "1/2||x", "1||x") == 0.5
+    # з alternatives ключ цілком теж приймається, «\/» — екранована риска
+    assert _grade("short_answer", "and/or", "and/or", config=ALTERNATIVES) == 1.0
+    assert _grade("short_answer", "and/or", "or", config=ALTERNATIVES) == 1.0
+    assert _grade("gap_fill", "1\\/2/half", "1/2", config=ALTERNATIVES) == 1.0
+    assert _grade("gap_fill", "1\\/2/half", "1", config=ALTERNATIVES) == 0.0
+
+
+def test_short_answer_exact_by_default():
+    assert _grade("short_answer", "He has", "  he HAS. ") == 1.0
+    # граматична різниця — саме те, що перевіряє питання
+    assert _grade("short_answer", "He has", "He had") == 0.0
+    assert _grade("short_answer", "studied", "studies") == 0.0
+    assert _grade("short_answer", "colour/color", "color", config=ALTERNATIVES) == 1.0
+
+
+def test_short_answer_typo_tolerance_is_opt_in():
+    typos = {"typo_tolerance": True}
+    assert _grade("short_answer", "beautiful", "  Beautifull. ") == 0.0
+    assert _grade("short_answer", "beautiful", "  Beautifull. ", config=typos) == 1.0
+    assert _grade("short_answer", "cat", "cut", config=typos) == 0.0
+    assert grading.within_distance("kitten", "sitting", 3)
+    assert not grading.within_distance("kitten", "sitting", 2)
+
+
+def test_ordering_and_matching_partial_credit():
+    assert _grade("ordering", "c,a,b", "c, a, b") == 1.0
+    assert _grade("ordering", "c,a,b", "c,b,a") == 1 / 3
+    assert _grade("matching", "1=b, 2=a", "2=a,1=c") == 0.5
+
+
+def test_manual_types_and_empty_keys_are_not_graded():
+    assert grading.compile_key("writing", "anything", None) is None
+    assert grading.compile_key("gap_fill", "  ", None) is None
+    assert grading.grade("writing", None, "text") is None
+
+
+def test_answer_key_roundtrip_and_grade_many():
+    options = {"A": "Paris", "B": "London"}
+    key = AnswerKey(
+        lesson_id=1,
+        blocks={10: "multiple_choice", 11: "gap_fill", 12: "writing"},
+        questions={
+            1: QuestionKey(10, "multiple_choice", grading.compile_key("multiple_choice", "A", options)),
+            2: QuestionKey(11, "gap_fill", grading.compile_key("gap_fill", "go||on", None)),
+        },
+    )
+    # JSON у Redis перетворює кортежі на списки
+    restored = AnswerKey.from_cache(1, json.loads(json.dumps(key.to_cache())))
+    assert restored.questions == key.questions
+    assert _freeze([["a", ["b"]]]) == (("a", ("b",)),)
+    assert restored.knows(10, 1) and restored.knows(12, None)
+    assert not restored.knows(11, 1) and not restored.knows(10, 99) and not restored.knows(99, None)
+    assert restored.grade_many([(10, 1, "A"), (11, 2, "go||in"), (12, None, "essay"), (11, 1, "A")]) == [
+        1.0,
+        0.5,
+        None,
+        None,
+    ]
+
+
+class FakeLessonSession:
+    """Версія уроку й рядки дерева; рахує, скільки разів ключ будували з БД."""
+
+    def __init__(self):
+        self.version = 1
+        self.correct = "cat"
+        self.builds = 0
+
+    async def execute(self, stmt):
+        if len(stmt.selected_columns) == 1:
+            return SimpleNamespace(scalar_one_or_none=lambda: self.version)
+        self.builds += 1
+        rows = [(self.version, 10, "short_answer", None, 100, self.correct, None)]
+        return SimpleNamespace(all=lambda: rows)
+
+
+@pytest.mark.asyncio
+async def test_answer_key_cache_follows_content_version(monkeypatch):
+    store = {}
+
+    async def fake_get(key):
+        return json.loads(store[key]) if key in store else None
+
+    async def fake_set(key, value, ttl=None):
+        store[key] = json.dumps(value)
+
+    monkeypatch.setattr(answer_key_module, "get_cache", fake_get)
+    monkeypatch.setattr(answer_key_module, "set_cache", fake_set)
+    session = FakeLessonSession()
+
+    assert (await get_answer_key(session, 1)).grade(10, 100, "cat") == 1.0
+    await get_answer_key(session, 1)
+    assert session.builds == 1
+
+    # правка питання піднімає content_version — новий ключ без жодної інвалідації
+    session.version, session.correct = 2, "dog"
+    assert (await get_answer_key(session, 1)).grade(10, 100, "dog") == 1.0
+    assert session.builds == 2
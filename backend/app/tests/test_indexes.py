@@ -0,0 +1,23 @@
+import app.models  # noqa: F401  — реєструє всі моделі на Base.metadata
+from app.core.database import Base
+
+
+def _covered(table, fk_columns):
+    """FK покритий, якщо є неповний (не partial) індекс, що починається з його колонок."""
+    for index in table.indexes:
+        if index.dialect_options["postgresql"].get("where") is not None:
+            continue
+        leading = [c.name for c in index.columns][: len(fk_columns)]
+        if leading == fk_columns:
+            return True
+    return False
+
+
+def test_every_foreign_key_has_covering_index():
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        for fk in table.foreign_key_constraints:
+            columns = [c.name for c in fk.columns]
+            if not _covered(table, columns):
+                missing.append(f"{table.name}({', '.join(columns)})")
+    assert not missing, "FK без індексу: " + "; ".join(missing)
@@ -0,0 +1,37 @@
+"""Текст фрейму однаковий з orjson і без нього; Broker без publish не створюється.
+
+Запуск: python -m pytest -q app/tests/test_ws_frame.py
+"""
+import enum
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.core import ws_frame
+from app.core.broker import Broker
+
+PAYLOAD = {
+    "type": "message",
+    "text": "Привіт",
+    "sent_at": datetime(2026, 1, 2, 10, 30, 5, 120000, tzinfo=timezone.utc),
+    "naive": datetime(2026, 1, 2, 10, 30),
+    "day": date(2026, 1, 2),
+    "role": enum.Enum("Role", {"STAFF": "staff"}).STAFF,
+}
+
+
+@pytest.mark.skipif(ws_frame.orjson is None, reason="orjson не встановлено")
+def test_encode_is_the_same_with_and_without_orjson(monkeypatch):
+    with_orjson = ws_frame.encode(PAYLOAD)
+    monkeypatch.setattr(ws_frame, "orjson", None)
+    assert ws_frame.encode(PAYLOAD) == with_orjson
+    assert '"sent_at":"2026-01-02T10:30:05.120000+00:00"' in with_orjson
+    assert '"naive":"2026-01-02T10:30:00"' in with_orjson and '"role":"staff"' in with_orjson
+
+
+def test_broker_requires_publish():
+    class Incomplete(Broker):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,149 @@
+"""Навантажувальна перевірка: N відкритих «тихих» сокетів не тримають жодного зʼєднання з пулу БД.
+
+Сесії підмінені лічильником (скільки відкрито зараз / за весь час), брокер — in-memory,
+Redis — мінімальна заглушка. Запуск: python -m pytest -q app/tests/test_ws_sessions.py
+"""
+from contextlib import ExitStack
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.connection import call_ws, chat_ws, classroom_ws
+from app.api.connection.ws_auth import UserSnapshot
+from app.core.broker import InMemoryBroker
+
+N = 40
+
+
+class FakeSessions:
+    """Замість async_session_maker: рахує відкриті сесії."""
+
+    def __init__(self):
+        self.open = 0
+        self.opened = 0
+        self.peak = 0
+        self._next_id = 1
+
+    def __call__(self):
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, counter: FakeSessions):
+        self.counter = counter
+
+    async def __aenter__(self):
+        self.counter.open += 1
+        self.counter.opened += 1
+        self.counter.peak = max(self.counter.peak, self.counter.open)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.counter.open -= 1
+
+    async def get(self, model, pk):
+        return SimpleNamespace(id=pk, status="active")
+
+    async def execute(self, stmt, *args):
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(first=lambda: None))
+
+    def add(self, obj):
+        self._obj = obj
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, obj):
+        obj.id = self.counter._next_id
+        obj.sent_at = None
+        self.counter._next_id += 1
+
+
+class FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+
+    def pipeline(self):
+        redis = self
+
+        class Pipe:
+            def hset(self, key, field, value):
+                redis.hashes.setdefault(key, {})[field] = value
+
+            def expire(self, key, ttl):
+                pass
+
+            async def execute(self):
+                return []
+
+        return Pipe()
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    async def hdel(self, key, *fields):
+        for f in fields:
+            self.hashes.get(key, {}).pop(f, None)
+
+
+async def _auth(token: str) -> UserSnapshot:
+    return UserSnapshot(id=int(token), username=f"user{token}", role="student", status=None)
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+async def _no_history(chat_id):
+    return []
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    counter = FakeSessions()
+    for module in (call_ws, chat_ws, classroom_ws):
+        monkeypatch.setattr(module, "async_session_maker", counter)
+        monkeypatch.setattr(module, "authenticate_ws", _auth)
+    monkeypatch.setattr(chat_ws.hub, "broker", InMemoryBroker())
+    monkeypatch.setattr(classroom_ws.hub, "broker", InMemoryBroker())
+    monkeypatch.setattr(chat_ws, "get_cached_chat_frames", _no_history)
+    monkeypatch.setattr(chat_ws, "cache_chat_message", _noop)
+    monkeypatch.setattr(chat_ws, "mark_recent_write", _noop)
+    monkeypatch.setattr(call_ws, "get_cache", _noop)
+    monkeypatch.setattr(call_ws, "set_cache", _noop)
+    monkeypatch.setattr(
+        call_ws, "connection_manager", call_ws.ConnectionManager(InMemoryBroker(), FakeRedis())
+    )
+    return counter
+
+
+def test_idle_sockets_hold_no_db_sessions(sessions):
+    app = FastAPI()
+    app.include_router(chat_ws.router, prefix="/chat-ws")
+    app.include_router(classroom_ws.router, prefix="/classroom-ws")
+    app.include_router(call_ws.router)
+
+    with TestClient(app) as client, ExitStack() as stack:
+        chats, calls = [], []
+        for uid in range(1, N + 1):
+            stack.enter_context(client.websocket_connect(f"/classroom-ws/1?token={uid}"))
+            chats.append(stack.enter_context(client.websocket_connect(f"/chat-ws/1?token={uid}")))
+            call = stack.enter_context(client.websocket_connect(f"/ws/calls/1?token={uid}"))
+            assert call.receive_json()["action"] == "peers"
+            calls.append(call)
+
+        # запис у чат — коротка сесія на insert, відповідь приходить усім учасникам
+        chats[0].send_json({"content": "hi"})
+        for ws in chats:
+            assert ws.receive_json()["message"] == "hi"
+
+        assert sessions.opened > 0  # сесії були, але лише на час окремих запитів
+        assert sessions.open == 0
+        assert sessions.peak <= 1
+
+        client.portal.call(call_ws.connection_manager.stop)
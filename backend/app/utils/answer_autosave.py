@@ -0,0 +1,225 @@
+"""Автозбереження відповідей, що приходять через WebSocket класу.
+
+Кожне `answer_update` від учня кладемо в памʼять під ключем (attempt, block, question):
+нове значення просто перетирає попереднє. Фонова задача раз на FLUSH_INTERVAL секунд
+забирає все накопичене, перевіряє по ключу відповідей уроку і пише одним
+INSERT ... ON CONFLICT. Тож друк у полі коштує один запис у БД на вікно, а не запит на символ.
+
+Запис захищений від «чужих» даних: блоки й питання, яких немає в ключі уроку
+(id від клієнта, видалене під час друку питання), відкидаються, а спроби, що вже не
+in_progress, не пишуться. Кожна спроба — у власному savepoint: збій однієї не скасовує інші.
+
+Буфер живе в процесі, а сокет класу зазвичай на іншому воркері, ніж HTTP-запит
+завершення. Тому `complete_attempt` перед підрахунком викликає `finish(attempt_id)`:
+запит іде через брокер усім воркерам, кожен закриває спробу (put більше не приймає
+її відповіді), дописує її буфер у БД і підтверджує. При зупинці застосунку `stop()`
+дописує все, що лишилось.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+from sqlalchemy.future import select
+
+from app.core.broker import Broker, broker as default_broker
+from app.core.database import async_session_maker
+from app.models.controls.lesson_attempt import LessonAttempt
+from app.utils.answer_key import get_answer_key
+from app.utils.answers import graded_rows, upsert_answers
+
+logger = logging.getLogger("answer_autosave")
+
+FLUSH_INTERVAL = 0.5   # сек; вікно дебаунсу
+MAX_RETRIES = 3        # стільки разів повертаємо пачку в буфер, якщо запис упав
+CLOSED_TTL = 3600      # сек; скільки памʼятаємо завершені спроби
+FINISH_CHANNEL = "autosave:finish"
+FINISH_TIMEOUT = 5.0   # сек; скільки complete_attempt чекає підтверджень воркерів
+
+# (attempt_id, block_id, question_id) -> (lesson_id, student_answer, спроб запису)
+PendingKey = tuple[int, int, int | None]
+Batch = dict[PendingKey, tuple[int, str | None, int]]
+
+
+class AnswerAutosave:
+    def __init__(self, interval: float = FLUSH_INTERVAL, broker: Broker = default_broker):
+        self.interval = interval
+        self.broker = broker
+        self._pending: Batch = {}
+        self._closed: dict[int, float] = {}  # attempt_id -> до коли памʼятаємо (monotonic)
+        self._lock = asyncio.Lock()  # пачки пишуться по черзі — старіше значення не перетре новіше
+        self._task: asyncio.Task | None = None
+        self._finishing: set[asyncio.Task] = set()
+
+    def put(self, lesson_id: int, attempt_id: int, block_id: int, question_id: int | None, value) -> bool:
+        """False — спроба вже завершена, відповідь не прийнято."""
+        if self.is_closed(attempt_id):
+            return False
+        if value is not None and not isinstance(value, str):
+            value = str(value)
+        self._pending[(attempt_id, block_id, question_id)] = (lesson_id, value, 0)
+        return True
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    # ---------- завершені спроби ----------
+    def is_closed(self, attempt_id: int) -> bool:
+        expires = self._closed.get(attempt_id)
+        return expires is not None and expires > time.monotonic()
+
+    def _close(self, attempt_id: int) -> None:
+        now = time.monotonic()
+        self._closed = {a: t for a, t in self._closed.items() if t > now}
+        self._closed[attempt_id] = now + CLOSED_TTL
+
+    async def finish(self, attempt_id: int) -> None:
+        """Перед підрахунком спроби: закрити її на всіх воркерах і дочекатися, поки кожен допише буфер."""
+        reply = f"autosave:finished:{uuid.uuid4().hex}"
+        acks, expected = 0, None
+        done = asyncio.Event()
+
+        async def on_ack(message: str) -> None:
+            nonlocal acks
+            acks += 1
+            if expected is not None and acks >= expected:
+                done.set()
+
+        await self.broker.subscribe(reply, on_ack)
+        try:
+            expected = await self.broker.publish(
+                FINISH_CHANNEL, json.dumps({"attempt_id": attempt_id, "reply": reply})
+            )
+            if acks >= expected:
+                done.set()
+            await asyncio.wait_for(done.wait(), FINISH_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"[AUTOSAVE] attempt {attempt_id}: {acks}/{expected} workers flushed in time")
+        except Exception as e:
+            # брокер недоступний — дописуємо хоча б свій буфер
+            logger.error(f"[AUTOSAVE] finish broadcast for attempt {attempt_id} failed: {e}")
+            self._close(attempt_id)
+            await self.flush(attempt_id)
+        finally:
+            await self.broker.unsubscribe(reply, on_ack)
+
+    async def _on_finish(self, message: str) -> None:
+        try:
+            data = json.loads(message)
+            attempt_id, reply = int(data["attempt_id"]), str(data["reply"])
+        except (ValueError, KeyError, TypeError):
+            return
+        self._close(attempt_id)
+        # запис — окремою задачею, щоб не тримати читання брокера на час запиту в БД
+        task = asyncio.create_task(self._flush_and_ack(attempt_id, reply))
+        self._finishing.add(task)
+        task.add_done_callback(self._finishing.discard)
+
+    async def _flush_and_ack(self, attempt_id: int, reply: str) -> None:
+        try:
+            await self.flush(attempt_id)
+        finally:
+            try:
+                await self.broker.publish(reply, "ok")
+            except Exception as e:
+                logger.warning(f"[AUTOSAVE] finish ack for attempt {attempt_id} failed: {e}")
+
+    # ---------- запис ----------
+    def _take(self, attempt_id: int | None) -> Batch:
+        if attempt_id is None:
+            batch, self._pending = self._pending, {}
+            return batch
+        keys = [k for k in self._pending if k[0] == attempt_id]
+        return {k: self._pending.pop(k) for k in keys}
+
+    async def flush(self, attempt_id: int | None = None) -> int:
+        """Пише накопичене (або лише одну спробу) в БД; повертає кількість записаних рядків."""
+        async with self._lock:
+            batch = self._take(attempt_id)
+            if not batch:
+                return 0
+            try:
+                written, failed = await self._write(batch)
+            except Exception as e:
+                logger.error(f"[AUTOSAVE] flush of {len(batch)} answers failed: {e}")
+                written, failed = 0, batch
+            if failed:
+                self._requeue(failed)
+            return written
+
+    def _requeue(self, batch: Batch) -> None:
+        for k, (lesson_id, value, tries) in batch.items():
+            # новіше значення, що прийшло під час запису, важливіше за повтор
+            if k not in self._pending and tries + 1 < MAX_RETRIES and not self.is_closed(k[0]):
+                self._pending[k] = (lesson_id, value, tries + 1)
+
+    async def _write(self, batch: Batch) -> tuple[int, Batch]:
+        """(записано рядків, пачка для повтору — лише спроби, чий savepoint упав)."""
+        by_attempt: dict[tuple[int, int], Batch] = {}
+        for k, v in batch.items():
+            by_attempt.setdefault((v[0], k[0]), {})[k] = v
+
+        written, failed = 0, {}
+        async with async_session_maker() as session:
+            open_ids = set(
+                (
+                    await session.execute(
+                        select(LessonAttempt.id).where(
+                            LessonAttempt.id.in_({a for _, a in by_attempt}),
+                            LessonAttempt.status == "in_progress",
+                        )
+                    )
+                ).scalars()
+            )
+            for (lesson_id, attempt_id), part in by_attempt.items():
+                if attempt_id not in open_ids:
+                    continue  # спробу завершено або видалено
+                key = await get_answer_key(session, lesson_id)
+                items = []
+                for (_, block_id, question_id), (_, value, _) in part.items():
+                    # id від клієнта або блок/питання видалили, поки учень друкував
+                    if key.knows(block_id, question_id):
+                        items.append((block_id, question_id, value))
+                    else:
+                        logger.warning(
+                            f"[AUTOSAVE] attempt {attempt_id}: unknown block {block_id} / question {question_id}"
+                        )
+                if not items:
+                    continue
+                try:
+                    async with session.begin_nested():
+                        await upsert_answers(session, graded_rows(key, attempt_id, items))
+                    written += len(items)
+                except Exception as e:
+                    logger.error(f"[AUTOSAVE] attempt {attempt_id}: {len(items)} answers failed: {e}")
+                    failed.update(part)
+            await session.commit()
+        return written, failed
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self.broker.subscribe(FINISH_CHANNEL, self._on_finish)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self.broker.unsubscribe(FINISH_CHANNEL, self._on_finish)
+        if self._finishing:
+            await asyncio.gather(*self._finishing, return_exceptions=True)
+        await self.flush()
+
+
+answer_autosave = AnswerAutosave()
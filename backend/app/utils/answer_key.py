@@ -0,0 +1,175 @@
+"""Скомпільований ключ відповідей уроку для автоперевірки.
+
+Для кожного уроку один раз будуємо незмінний обʼєкт
+question_id -> (block_id, task_type, скомпільований ключ грейдера)
+з дерева Section -> Block -> Question. Правила перевірки — в app/utils/grading.py.
+
+Кеш — спільний app/core/cache.py (L1 воркера + Redis) під ключем з `Lesson.content_version`,
+як і в кеші повного уроку: будь-яка правка секцій/блоків/питань піднімає версію,
+тож усі воркери одразу читають новий ключ, а старий просто вигасає. Окремої інвалідації немає.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.cache import get_cache, set_cache
+from app.models.controls.lessons import Lesson
+from app.models.controls.section import Section
+from app.models.controls.block import Block
+from app.models.controls.questions import Question
+from app.utils import grading
+
+REDIS_TTL = 3600
+
+
+def _freeze(value):
+    """Списки з JSON назад у кортежі (ключі грейдерів — лише рядки й кортежі)."""
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@dataclass(frozen=True)
+class QuestionKey:
+    block_id: int
+    task_type: str | None
+    key: tuple | None  # скомпільований ключ grading.compile_key; None — без автоперевірки
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    lesson_id: int
+    blocks: Mapping[int, str | None]         # block_id -> task_type
+    questions: Mapping[int, QuestionKey]     # question_id -> ключ
+
+    def _entry(self, block_id: int, question_id: int | None) -> QuestionKey | None:
+        entry = self.questions.get(question_id) if question_id is not None else None
+        if entry is None or entry.block_id != block_id:
+            return None
+        return entry
+
+    def knows(self, block_id: int, question_id: int | None) -> bool:
+        """Блок є в уроці, а питання (якщо вказане) — саме в цьому блоці."""
+        if block_id not in self.blocks:
+            return False
+        return question_id is None or self._entry(block_id, question_id) is not None
+
+    def grade(self, block_id: int, question_id: int | None, student_answer) -> float | None:
+        """Бал 0..1 для обʼєктивних типів, None — якщо автоперевірка неможлива."""
+        entry = self._entry(block_id, question_id)
+        if entry is None:
+            return None
+        return grading.grade(entry.task_type, entry.key, student_answer)
+
+    def grade_many(self, items) -> list[float | None]:
+        """[(block_id, question_id, student_answer), …] -> бали одним проходом."""
+        batch = []
+        for block_id, question_id, student_answer in items:
+            entry = self._entry(block_id, question_id)
+            if entry is None:
+                batch.append((None, None, student_answer))
+            else:
+                batch.append((entry.task_type, entry.key, student_answer))
+        return grading.grade_many(batch)
+
+    # --- серіалізація для Redis (лише списки, щоб object_hook кешу їх не чіпав) ---
+    def to_cache(self) -> dict:
+        return {
+            "blocks": [[bid, task_type] for bid, task_type in self.blocks.items()],
+            "questions": [
+                [qid, e.block_id, e.task_type, e.key]
+                for qid, e in self.questions.items()
+            ],
+        }
+
+    @classmethod
+    def from_cache(cls, lesson_id: int, data: dict) -> "AnswerKey":
+        return cls(
+            lesson_id=lesson_id,
+            blocks=MappingProxyType({bid: task_type for bid, task_type in data["blocks"]}),
+            questions=MappingProxyType(
+                {
+                    qid: QuestionKey(block_id, task_type, _freeze(key))
+                    for qid, block_id, task_type, key in data["questions"]
+                }
+            ),
+        )
+
+
+def _cache_key(lesson_id: int, version: int) -> str:
+    # v7: змінились правила компіляції ключів; старі записи просто вигасають
+    return f"answer_key:v7:{lesson_id}:{version}"
+
+
+async def build_answer_key(session: AsyncSession, lesson_id: int) -> tuple[int | None, AnswerKey]:
+    """Один SELECT по дереву уроку, без ORM-обʼєктів.
+
+    Версія читається тим самим запитом, що й дерево, тож ключ кешується саме під
+    ту версію, з якої його зібрано (None — уроку немає).
+    """
+    result = await session.execute(
+        select(
+            Lesson.content_version,
+            Block.id,
+            Block.task_type,
+            Block.config,
+            Question.id,
+            Question.correct_answer,
+            Question.options,
+        )
+        .select_from(Lesson)
+        .outerjoin(Section, Section.lesson_id == Lesson.id)
+        .outerjoin(Block, Block.section_id == Section.id)
+        .outerjoin(Question, Question.block_id == Block.id)
+        .where(Lesson.id == lesson_id)
+    )
+    version = None
+    blocks = {}
+    questions = {}
+    for version, block_id, task_type, config, question_id, correct_answer, options in result.all():
+        if block_id is None:
+            continue
+        blocks[block_id] = task_type
+        if question_id is not None:
+            key = grading.compile_key(task_type, correct_answer, options, config)
+            questions[question_id] = QuestionKey(block_id, task_type, key)
+    return version, AnswerKey(
+        lesson_id=lesson_id,
+        blocks=MappingProxyType(blocks),
+        questions=MappingProxyType(questions),
+    )
+
+
+async def get_answer_key(session: AsyncSession, lesson_id: int) -> AnswerKey:
+    """content_version уроку -> кеш (L1/Redis) -> БД."""
+    version = (
+        await session.execute(select(Lesson.content_version).where(Lesson.id == lesson_id))
+    ).scalar_one_or_none()
+    if version is not None:
+        cached = await get_cache(_cache_key(lesson_id, version))
+        if cached:
+            return AnswerKey.from_cache(lesson_id, cached)
+
+    version, key = await build_answer_key(session, lesson_id)
+    if version is not None:
+        await set_cache(_cache_key(lesson_id, version), key.to_cache(), ttl=REDIS_TTL)
+    return key
+
+
+async def lesson_id_for_section(session: AsyncSession, section_id: int) -> int | None:
+    return (
+        await session.execute(select(Section.lesson_id).where(Section.id == section_id))
+    ).scalar_one_or_none()
+
+
+async def lesson_id_for_block(session: AsyncSession, block_id: int) -> int | None:
+    return (
+        await session.execute(
+            select(Section.lesson_id)
+            .join(Block, Block.section_id == Section.id)
+            .where(Block.id == block_id)
+        )
+    ).scalar_one_or_none()
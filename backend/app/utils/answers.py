@@ -0,0 +1,62 @@
+"""Запис відповідей учня: спільне для HTTP-ендпоінтів спроб і автозбереження з WebSocket."""
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.controls.answer import Answer
+from app.utils import grading
+from app.utils.answer_key import AnswerKey
+
+
+def graded_rows(key: AnswerKey, attempt_id: int, items) -> list[dict]:
+    """[(block_id, question_id, student_answer), …] -> рядки для upsert_answers з автоперевіркою."""
+    items = list(items)
+    scores = key.grade_many(items)
+    return [
+        dict(
+            attempt_id=attempt_id,
+            block_id=block_id,
+            question_id=question_id,
+            student_answer=student_answer,
+            is_correct=grading.is_correct(score),
+            bot_score=score,
+        )
+        for (block_id, question_id, student_answer), score in zip(items, scores)
+    ]
+
+
+async def upsert_answers(session: AsyncSession, rows: list[dict]) -> list[Answer]:
+    """INSERT ... ON CONFLICT DO UPDATE ... RETURNING по унікальних індексах answers.
+
+    Індексів два (question_id IS NULL / IS NOT NULL), тож рядки з питанням і без
+    пишуться окремими стейтментами. Повертає відповіді в порядку `rows`.
+    """
+    saved = {}
+    for with_question in (True, False):
+        group = [r for r in rows if (r["question_id"] is not None) == with_question]
+        if not group:
+            continue
+        stmt = insert(Answer).values(group)
+        if with_question:
+            conflict = dict(
+                index_elements=[Answer.attempt_id, Answer.block_id, Answer.question_id],
+                index_where=Answer.question_id.is_not(None),
+            )
+        else:
+            conflict = dict(
+                index_elements=[Answer.attempt_id, Answer.block_id],
+                index_where=Answer.question_id.is_(None),
+            )
+        stmt = stmt.on_conflict_do_update(
+            **conflict,
+            set_={
+                "student_answer": stmt.excluded.student_answer,
+                "is_correct": stmt.excluded.is_correct,
+                "bot_score": stmt.excluded.bot_score,
+                "answered_at": func.now(),
+            },
+        ).returning(Answer)
+        result = await session.scalars(stmt, execution_options={"populate_existing": True})
+        for a in result:
+            saved[(a.block_id, a.question_id)] = a
+    return [saved[(r["block_id"], r["question_id"])] for r in rows]
@@ -0,0 +1,89 @@
+"""Підсумки спроби, що зберігаються в lesson_attempts при завершенні.
+
+Один агрегатний запит по «слотах» уроку:
+  - кожне питання уроку (з відповіддю цієї спроби або без неї);
+  - відповіді на рівні блоку (question_id IS NULL) — без автоперевірки.
+Групуємо по секції; загальні суми — це суми по секціях.
+Автоперевірювані питання — ті, для яких скомпільовано ключ (app/utils/answer_key.py),
+1 бал за питання; решта (ручна перевірка, ключ не розібрався) у max_score не входить.
+"""
+from typing import Iterable
+
+from sqlalchemy import and_, func, literal, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.controls.answer import Answer
+from app.models.controls.block import Block
+from app.models.controls.lesson_attempt import LessonAttempt
+from app.models.controls.questions import Question
+from app.models.controls.section import Section
+from app.utils.answer_key import get_answer_key
+
+
+def _section_scores_query(attempt_id: int, lesson_id: int, auto_question_ids: Iterable[int]):
+    question_slots = (
+        select(
+            Block.section_id.label("section_id"),
+            Question.id.in_(sorted(auto_question_ids)).label("auto"),
+            Answer.id.label("answer_id"),
+            Answer.bot_score.label("bot_score"),
+        )
+        .select_from(Question)
+        .join(Block, Block.id == Question.block_id)
+        .join(Section, Section.id == Block.section_id)
+        .outerjoin(
+            Answer,
+            and_(Answer.question_id == Question.id, Answer.attempt_id == attempt_id),
+        )
+        .where(Section.lesson_id == lesson_id)
+    )
+    block_slots = (
+        select(
+            Block.section_id,
+            literal(False),
+            Answer.id,
+            Answer.bot_score,
+        )
+        .select_from(Answer)
+        .join(Block, Block.id == Answer.block_id)
+        .where(Answer.attempt_id == attempt_id, Answer.question_id.is_(None))
+    )
+    slots = union_all(question_slots, block_slots).subquery("slots")
+    return (
+        select(
+            slots.c.section_id,
+            func.coalesce(func.sum(slots.c.bot_score), 0.0).label("score"),
+            func.count().filter(slots.c.auto).label("max_score"),
+            func.count(slots.c.answer_id).label("answered"),
+        )
+        .group_by(slots.c.section_id)
+        .order_by(slots.c.section_id)
+    )
+
+
+async def score_attempt(session: AsyncSession, attempt: LessonAttempt) -> None:
+    """Рахує й записує в `attempt` авто-бал, максимум, кількість відповідей,
+    бали по секціях і витрачений час. Коміт — на боці викликача."""
+    key = await get_answer_key(session, attempt.lesson_id)
+    auto_ids = [qid for qid, entry in key.questions.items() if entry.key is not None]
+    rows = (
+        await session.execute(_section_scores_query(attempt.id, attempt.lesson_id, auto_ids))
+    ).all()
+    sections = [
+        {
+            "section_id": r.section_id,
+            "score": float(r.score),
+            "max_score": float(r.max_score),
+            "answered": r.answered,
+        }
+        for r in rows
+    ]
+    attempt.auto_score = sum(s["score"] for s in sections)
+    attempt.max_auto_score = sum(s["max_score"] for s in sections)
+    attempt.answered_count = sum(s["answered"] for s in sections)
+    attempt.section_scores = sections
+    if attempt.started_at and attempt.completed_at:
+        attempt.time_spent_seconds = max(
+            int((attempt.completed_at - attempt.started_at).total_seconds()), 0
+        )
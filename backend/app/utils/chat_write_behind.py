@@ -0,0 +1,160 @@
+"""Відкладений (write-behind) запис повідомлень чату.
+
+Вмикається `settings.chat_write_behind`. Тоді повідомлення одразу отримує id,
+розсилається в сокети, а в `chat_messages` потрапляє пачкою: фоновий писар
+збирає чергу щонайбільше FLUSH_INTERVAL секунд або BATCH_SIZE повідомлень
+і вставляє одним INSERT.
+
+id беремо зі звичайної послідовності таблиці, але блоками по ID_BLOCK
+(один запит на сотню повідомлень): вони цілі й унікальні між воркерами і з HTTP-вставками,
+тож схема, фронтенд і дедуплікація за id лишаються як були.
+Вставка з ON CONFLICT (id) DO NOTHING — повтор після збою не створює дублів.
+Кожен чат пишеться у власному savepoint: рядок, що порушує обмеження (напр. чат
+видалили), відкидається й логується, а не губить пачку інших чатів.
+`stop()` у lifespan дописує все, що лишилось у черзі.
+"""
+import asyncio
+import logging
+from collections import deque
+
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.core.database import async_session_maker
+from app.models.connection.chat import ChatMessage
+
+logger = logging.getLogger("chat_write_behind")
+
+FLUSH_INTERVAL = 0.05   # сек
+BATCH_SIZE = 200
+ID_BLOCK = 100
+RETRY_DELAYS = (0.5, 1, 2, 5, 10)  # після цього пачку логуємо як втрачену
+
+_STOP = object()
+
+
+def _insert_stmt():
+    # sent_at штампується при постановці в чергу (UTC з таймзоною); як timestamptz Postgres
+    # приводить його до колонки так само, як func.now() у синхронному шляху
+    return (
+        insert(ChatMessage)
+        .values(sent_at=bindparam("sent_at_utc", type_=DateTime(timezone=True)))
+        .on_conflict_do_nothing(index_elements=[ChatMessage.id])
+    )
+
+
+class ChatWriteBehind:
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._ids: deque[int] = deque()
+        self._id_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    async def next_id(self) -> int:
+        if not self._ids:
+            async with self._id_lock:
+                if not self._ids:
+                    await self._reserve_ids()
+        return self._ids.popleft()
+
+    async def _reserve_ids(self) -> None:
+        async with async_session_maker() as session:
+            result = await session.execute(
+                text(
+                    "SELECT nextval(pg_get_serial_sequence('chat_messages', 'id')) "
+                    "FROM generate_series(1, :n)"
+                ),
+                {"n": ID_BLOCK},
+            )
+            self._ids.extend(sorted(r[0] for r in result))
+
+    def enqueue(self, message: ChatMessage) -> None:
+        """message з id від next_id() і sent_at = datetime.now(timezone.utc)."""
+        row = {
+            c.name: getattr(message, c.key) for c in ChatMessage.__table__.columns if c.name != "sent_at"
+        }
+        row["sent_at_utc"] = message.sent_at
+        self._queue.put_nowait(row)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    async def _write(self, batch: list[dict]) -> None:
+        """Збій зʼєднання чи БД летить нагору (повтор усієї пачки); зламані рядки лише відкидаються."""
+        by_chat: dict[int, list[dict]] = {}
+        for row in batch:
+            by_chat.setdefault(row["chat_id"], []).append(row)
+        async with async_session_maker() as session:
+            for chat_id, rows in by_chat.items():
+                try:
+                    async with session.begin_nested():
+                        await session.execute(_insert_stmt(), rows)
+                except (IntegrityError, DataError):
+                    # поштучно — щоб не загубити цілі рядки цього ж чату
+                    for row in rows:
+                        try:
+                            async with session.begin_nested():
+                                await session.execute(_insert_stmt(), [row])
+                        except (IntegrityError, DataError) as e:
+                            logger.error(f"[CHAT WB] dropping message {row['id']} of chat {chat_id}: {e}")
+            await session.commit()
+
+    async def _write_with_retry(self, batch: list[dict]) -> None:
+        for delay in (*RETRY_DELAYS, None):
+            try:
+                await self._write(batch)
+                return
+            except Exception as e:
+                if delay is None:
+                    logger.error(f"[CHAT WB] dropping {len(batch)} messages after retries: {e}")
+                    return
+                logger.warning(f"[CHAT WB] insert of {len(batch)} messages failed, retry in {delay}s: {e}")
+                await asyncio.sleep(delay)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = loop.time() + FLUSH_INTERVAL
+            while len(batch) < BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._write_with_retry(batch)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Дочікується запису всього, що вже в черзі."""
+        if self._task is None:
+            return
+        self._queue.put_nowait(_STOP)
+        await self._task
+        self._task = None
+        # те, що встигло прийти після сигналу зупинки
+        rest = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                rest.append(item)
+        if rest:
+            await self._write_with_retry(rest)
+
+
+chat_write_behind = ChatWriteBehind()
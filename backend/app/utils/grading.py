@@ -0,0 +1,286 @@
+"""Рушій автоперевірки відповідей: реєстр грейдерів по task_type.
+
+Кожен грейдер — пара чистих функцій:
+  compile(correct_answer, options, config) -> ключ   # один раз на питання, вже нормалізований
+  grade(key, student_answer) -> бал 0..1     # дешево, без БД і без повторної нормалізації ключа
+Ключ складається лише з рядків і кортежів, тож його можна класти в Redis
+(див. AnswerKey) і перевіряти всю спробу одним викликом `grade_many`.
+
+Формати correct_answer (як їх вводять у конструкторі уроку):
+  true_false       true / false (t, yes, 1 … теж приймаються)
+  multiple_choice  ключ опції або її текст; кілька правильних — через кому
+  gap_fill         пропуски через «||»
+  short_answer     коротка відповідь; регістр і пробіли не важать
+  ordering         елементи в правильному порядку через кому
+  matching         пари «ліве=праве» через кому
+Типи без грейдера (writing, open_text, listening …) перевіряє лише вчитель.
+
+config блоку (Block.config) вмикає додаткові правила:
+  alternatives: true   gap_fill / short_answer — «/» розділяє альтернативи («\/» — сама коса риска);
+                       ключ цілком («and/or», «1/2») зараховується завжди
+  multi_select: true   multiple_choice — учень обирає кілька опцій, бал — збіг множин (Жаккар);
+                       без нього — один вибір, будь-яка з правильних опцій зараховується
+  typo_tolerance: true short_answer — пробачаються дрібні опечатки (Левенштейн);
+                       без нього — точний збіг («has» і «had» — різні відповіді)
+"""
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, Mapping
+
+GAP_SEPARATOR = "||"
+ALTERNATIVE_SEPARATOR = "/"
+LIST_SEPARATOR = ","
+PAIR_SEPARATOR = "="
+
+_SPACES = re.compile(r"\s+")
+_ALTERNATIVE_SPLIT = re.compile(r"(?<!\\)" + re.escape(ALTERNATIVE_SEPARATOR))
+_ESCAPED_ALTERNATIVE = "\\" + ALTERNATIVE_SEPARATOR
+_TRAILING_PUNCT = ".!?;:"
+
+_TRUE = {"t", "true", "yes", "y", "1"}
+_FALSE = {"f", "false", "no", "n", "0"}
+
+
+def normalize_answer(s) -> str:
+    """Нижній регістр, пробіли по краях прибрано, усередині — схлопнуто до одного."""
+    return _SPACES.sub(" ", str(s or "")).strip().lower()
+
+
+def _split(s, sep: str) -> tuple[str, ...]:
+    return tuple(p for p in (normalize_answer(x) for x in str(s or "").split(sep)) if p)
+
+
+def _alternatives(s, config: Mapping | None) -> tuple[str, ...]:
+    """Прийнятні варіанти однієї відповіді. Без config.alternatives — лише ключ як є."""
+    s = str(s or "")
+    if not (config or {}).get("alternatives"):
+        whole = normalize_answer(s)
+        return (whole,) if whole else ()
+    parts = [
+        normalize_answer(p.replace(_ESCAPED_ALTERNATIVE, ALTERNATIVE_SEPARATOR))
+        for p in [s, *_ALTERNATIVE_SPLIT.split(s)]
+    ]
+    return tuple(dict.fromkeys(p for p in parts if p))
+
+
+@dataclass(frozen=True)
+class Grader:
+    compile: Callable[[str, Mapping | None, Mapping | None], tuple]
+    grade: Callable[[tuple, str | None], float]
+
+
+GRADERS: dict[str, Grader] = {}
+
+
+def register(task_type: str, compile: Callable, grade: Callable) -> None:
+    GRADERS[task_type] = Grader(compile, grade)
+
+
+def compile_key(
+    task_type: str | None,
+    correct_answer: str | None,
+    options: Mapping | None = None,
+    config: Mapping | None = None,
+):
+    """Ключ для grade(); None — питання не перевіряється автоматично. config — Block.config."""
+    grader = GRADERS.get(task_type)
+    if grader is None or not normalize_answer(correct_answer):
+        return None
+    return grader.compile(correct_answer, options, config) or None
+
+
+def grade(task_type: str | None, key, student_answer) -> float | None:
+    """Бал 0..1 або None, якщо автоперевірка неможлива."""
+    if key is None:
+        return None
+    grader = GRADERS.get(task_type)
+    if grader is None:
+        return None
+    return grader.grade(key, student_answer)
+
+
+def grade_many(items: Iterable[tuple[str | None, tuple | None, str | None]]) -> list[float | None]:
+    """Перевірка всієї спроби за раз: [(task_type, key, student_answer), …] -> [бал | None, …]."""
+    graders = GRADERS
+    out = []
+    for task_type, key, student_answer in items:
+        grader = graders.get(task_type) if key is not None else None
+        out.append(None if grader is None else grader.grade(key, student_answer))
+    return out
+
+
+def is_correct(score: float | None) -> bool | None:
+    return None if score is None else score >= 1.0
+
+
+# ---------- true_false ----------
+def _bool_token(s) -> str:
+    v = normalize_answer(s)
+    if v in _TRUE:
+        return "true"
+    if v in _FALSE:
+        return "false"
+    return v
+
+
+def _compile_true_false(correct, options, config):
+    return (_bool_token(correct),)
+
+
+def _grade_true_false(key, answer):
+    return 1.0 if _bool_token(answer) == key[0] else 0.0
+
+
+register("true_false", _compile_true_false, _grade_true_false)
+
+
+# ---------- multiple_choice (один вибір або мультивибір за config) ----------
+# ключ: (правильні тексти опцій, пари (ключ опції, текст) для мапінгу «A» -> текст, мультивибір)
+def _choices(s, lookup: Mapping[str, str]) -> set[str]:
+    """Опції з рядка як тексти. Рядок, що цілком є ключем чи текстом опції («Yes, I do»), за комою не ділимо."""
+    whole = normalize_answer(s)
+    if whole in lookup:
+        return {lookup[whole]}
+    if whole in lookup.values():
+        return {whole}
+    return {lookup.get(tok, tok) for tok in _split(s, LIST_SEPARATOR)}
+
+
+def _compile_multiple_choice(correct, options, config):
+    option_map = tuple(
+        sorted((normalize_answer(k), normalize_answer(v)) for k, v in (options or {}).items())
+    )
+    accepted = tuple(sorted(_choices(correct, dict(option_map))))
+    return (accepted, option_map, bool((config or {}).get("multi_select")))
+
+
+def _grade_multiple_choice(key, answer):
+    accepted, option_map, multi_select = key
+    chosen = _choices(answer, dict(option_map))
+    if not chosen:
+        return 0.0
+    accepted = set(accepted)
+    if multi_select:
+        # частка збігу множин (Жаккар): недобір і зайвий вибір штрафуються однаково
+        return len(chosen & accepted) / len(chosen | accepted)
+    # один вибір: рівно одна опція, будь-яка з правильних
+    return 1.0 if len(chosen) == 1 and chosen <= accepted else 0.0
+
+
+register("multiple_choice", _compile_multiple_choice, _grade_multiple_choice)
+
+
+# ---------- gap_fill (кілька пропусків, за config — альтернативи) ----------
+def _compile_gap_fill(correct, options, config):
+    blanks = str(correct).split(GAP_SEPARATOR)
+    return tuple(_alternatives(blank, config) for blank in blanks)
+
+
+def _grade_gap_fill(key, answer):
+    given = str(answer or "").split(GAP_SEPARATOR)
+    hits = 0
+    for i, alternatives in enumerate(key):
+        if i < len(given) and normalize_answer(given[i]) in alternatives:
+            hits += 1
+    return hits / len(key)
+
+
+register("gap_fill", _compile_gap_fill, _grade_gap_fill)
+
+
+# ---------- short_answer (за config — альтернативи й допуск на опечатки) ----------
+# ключ: (прийнятні відповіді, чи пробачати опечатки)
+def _strip_punct(s: str) -> str:
+    return s.rstrip(_TRAILING_PUNCT).rstrip()
+
+
+def typo_tolerance(length: int) -> int:
+    """Скільки правок Левенштейна пробачаємо для відповіді такої довжини."""
+    if length < 5:
+        return 0
+    if length < 12:
+        return 1
+    return 2
+
+
+def within_distance(a: str, b: str, limit: int) -> bool:
+    """Відстань Левенштейна a↔b не більша за limit (смуга шириною 2*limit+1)."""
+    if a == b:
+        return True
+    if limit <= 0 or abs(len(a) - len(b)) > limit:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        lo, hi = max(1, i - limit), min(len(b), i + limit)
+        cur = [i] + [limit + 1] * len(b)
+        for j in range(lo, hi + 1):
+            cost = 0 if ca == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+        if min(cur[lo - 1 : hi + 1]) > limit:
+            return False
+        prev = cur
+    return prev[len(b)] <= limit
+
+
+def _compile_short_answer(correct, options, config):
+    accepted = tuple(dict.fromkeys(_strip_punct(a) for a in _alternatives(correct, config)))
+    return (accepted, bool((config or {}).get("typo_tolerance")))
+
+
+def _grade_short_answer(key, answer):
+    accepted, tolerant = key
+    given = _strip_punct(normalize_answer(answer))
+    if not given:
+        return 0.0
+    if not tolerant:
+        return 1.0 if given in accepted else 0.0
+    for a in accepted:
+        if within_distance(given, a, typo_tolerance(len(a))):
+            return 1.0
+    return 0.0
+
+
+register("short_answer", _compile_short_answer, _grade_short_answer)
+
+
+# ---------- ordering (правильна послідовність) ----------
+def _compile_ordering(correct, options, config):
+    return _split(correct, LIST_SEPARATOR)
+
+
+def _grade_ordering(key, answer):
+    given = _split(answer, LIST_SEPARATOR)
+    hits = sum(1 for i, item in enumerate(key) if i < len(given) and given[i] == item)
+    return hits / len(key)
+
+
+register("ordering", _compile_ordering, _grade_ordering)
+
+
+# ---------- matching (пари ліве=праве) ----------
+def _pairs(s) -> tuple[tuple[str, str], ...]:
+    out = []
+    for item in _split(s, LIST_SEPARATOR):
+        left, sep, right = item.partition(PAIR_SEPARATOR)
+        if sep:
+            out.append((left.strip(), right.strip()))
+    return tuple(sorted(out))
+
+
+def _compile_matching(correct, options, config):
+    return _pairs(correct)
+
+
+def _grade_matching(key, answer):
+    given = dict(_pairs(answer))
+    hits = sum(1 for left, right in key if given.get(left) == right)
+    return hits / len(key)
+
+
+register("matching", _compile_matching, _grade_matching)
+
+
+# типи, де можлива автоматична (бот) перевірка
+AUTO_TYPES = frozenset(GRADERS)
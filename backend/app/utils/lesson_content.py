@@ -0,0 +1,21 @@
+"""Версія вмісту уроку.
+
+Кожен запис у секції/блоки/питання уроку піднімає `Lesson.content_version`
+у тій самій транзакції. На версію спираються кеш готового JSON повного уроку
+та його ETag (див. app/api/controls/lesson_content.py).
+"""
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.controls.lessons import Lesson
+
+
+async def bump_content_version(session: AsyncSession, lesson_id: int | None) -> None:
+    """Викликати до commit(), щоб версія змінилась атомарно з даними."""
+    if lesson_id is None:
+        return
+    await session.execute(
+        update(Lesson)
+        .where(Lesson.id == lesson_id)
+        .values(content_version=Lesson.content_version + 1)
+    )
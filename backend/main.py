@@ -33,6 +33,14 @@ from app.api.controls.lesson_content import router as lesson_content_router
 from app.api.controls.attempt import router as attempt_router
 
 from app.api.connection.livekit import router as livekit_router
+from app.api.internal import router as internal_router
+from app.utils.answer_autosave import answer_autosave
+from app.core.broker import broker
+from app.core.config import settings
+from app.utils.chat_write_behind import chat_write_behind
+from app.core.db_routing import ReadYourWritesMiddleware
+from app.core.cache import start_cache_invalidation, stop_cache_invalidation
+from app.api.connection.call_ws import connection_manager as call_connection_manager
 
 # Завантажуємо змінні середовища
 load_dotenv()
@@ -41,7 +49,17 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     """Ініціалізація перед запуском. Схемою БД керує Alembic."""
     await initialize_admin()  # Створюємо адміністратора, якщо його немає
+    await broker.start()      # розсилка WebSocket-подій між воркерами
+    await start_cache_invalidation(broker)  # L1-кеш: інвалідації від інших воркерів
+    await answer_autosave.start()  # пакетний запис відповідей з WebSocket класу
+    if settings.chat_write_behind:
+        chat_write_behind.start()
     yield
+    await answer_autosave.stop()
+    await chat_write_behind.stop()  # дописує чергу повідомлень чату
+    await call_connection_manager.stop()
+    await stop_cache_invalidation()
+    await broker.stop()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -52,7 +70,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
+# після запису користувач якийсь час читає з primary, а не з репліки
+app.add_middleware(ReadYourWritesMiddleware)
 
 # ✅ Включення маршрутів аутентифікації з правильними аргументами
 app.include_router(
@@ -115,6 +136,8 @@ app.include_router(block_router, tags=["Blocks"])
 app.include_router(lesson_content_router, tags=["Lesson Content"])
 app.include_router(attempt_router, tags=["Attempts"])
 
+app.include_router(internal_router)
+
 # ✅ **Перевірка підключення до Redis**
 from app.core.cache import set_cache, get_cache
 @app.get("/redis-ping")
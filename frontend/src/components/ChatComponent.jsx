@@ -88,10 +88,14 @@ const ChatComponent = ({ chatId, currentUser, onClose }) => {
       ws.onmessage = (event) => {
         try {
           const data = JSON.parse(event.data);
-          const k = keyOfMsg(data);
-          if (seenRef.current.has(k)) return; // дедуплікація (реплей кешу)
-          seenRef.current.add(k);
-          setMessages((prev) => [...prev, data]);
+          // реплей історії при підключенні приходить одним масивом
+          const fresh = (Array.isArray(data) ? data : [data]).filter((m) => {
+            const k = keyOfMsg(m);
+            if (seenRef.current.has(k)) return false; // дедуплікація (реплей кешу)
+            seenRef.current.add(k);
+            return true;
+          });
+          if (fresh.length) setMessages((prev) => [...prev, ...fresh]);
         } catch (e) {
           console.error('Error parsing message:', e);
         }
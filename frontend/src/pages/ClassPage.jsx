@@ -51,6 +51,7 @@ const ClassPage = () => {
   const inCallRef = useRef(false);
   const activeSectionRef = useRef(null);
   const lessonFullRef = useRef(null);
+  const pendingSaves = useRef(new Set()); // HTTP-збереження відповідей, що ще в дорозі
 
   const isStaff = user?.role === 'staff';
 
@@ -150,7 +151,11 @@ const ClassPage = () => {
 
   const sendWs = (obj) => {
     const ws = wsRef.current;
-    if (ws && ws.readyState === WebSocket.OPEN) ws.send(JSON.stringify(obj));
+    if (ws && ws.readyState === WebSocket.OPEN) {
+      ws.send(JSON.stringify(obj));
+      return true;
+    }
+    return false;
   };
 
   const startCall = () => {
@@ -187,6 +192,8 @@ const ClassPage = () => {
   const completeLesson = async () => {
     if (!attempt) return;
     try {
+      // відповіді, що ще зберігаються (blur на кнопці «Завершити»), — до підрахунку
+      await Promise.allSettled([...pendingSaves.current]);
       const token = localStorage.getItem('token');
       await axios.post(
         `${API_URL}/attempts/${attempt.id}/complete`,
@@ -272,18 +279,24 @@ const ClassPage = () => {
     if (!attempt) return null;
     return {
       initial,
-      save: async (blockId, questionId, studentAnswer) => {
+      // Остаточна відповідь (вибір, blur) — HTTP: галочка «збережено» лише після відповіді сервера.
+      // Через сокет — лише показ викладачу; автозбереження з сокета страхує недописане (див. live).
+      save: (blockId, questionId, studentAnswer) => {
         sendWs({ type: 'answer_update', block_id: blockId, question_id: questionId ?? null, value: studentAnswer });
         const token = localStorage.getItem('token');
-        await axios.post(
-          `${API_URL}/attempts/${attempt.id}/answer`,
-          { block_id: blockId, question_id: questionId ?? null, student_answer: studentAnswer },
-          { headers: { Authorization: `Bearer ${token}` } }
-        );
+        const req = axios
+          .post(
+            `${API_URL}/attempts/${attempt.id}/answer`,
+            { block_id: blockId, question_id: questionId ?? null, student_answer: studentAnswer },
+            { headers: { Authorization: `Bearer ${token}` } }
+          )
+          .finally(() => pendingSaves.current.delete(req));
+        pendingSaves.current.add(req);
+        return req;
       },
-      // Легка трансляція під час друку (без збереження в БД)
+      // Трансляція під час друку; у БД потрапляє останнє значення за вікно автозбереження
       live: (blockId, questionId, value) => {
-        sendWs({ type: 'answer_update', block_id: blockId, question_id: questionId ?? null, value });
+        sendWs({ type: 'answer_update', attempt_id: attempt.id, block_id: blockId, question_id: questionId ?? null, value });
       },
     };
   }, [attempt, initial]);
@@ -7,12 +7,16 @@ import "../styles/homework.css";
 
 const auth = () => ({ headers: { Authorization: `Bearer ${localStorage.getItem("token")}` } });
 const keyOf = (b, q) => `${b}:${q ?? "null"}`;
+// список спроб віддається сторінками: курсор наступної — у заголовку X-Next-Cursor
+const nextCursor = (res) => res.headers["x-next-cursor"] || null;
 
 export default function GradingPage() {
   const { lessonId } = useParams();
   const navigate = useNavigate();
   const [lesson, setLesson] = useState(null);
   const [attempts, setAttempts] = useState([]);
+  const [cursor, setCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selected, setSelected] = useState(null);
   const [attempt, setAttempt] = useState(null);
   const [answers, setAnswers] = useState(new Map());
@@ -27,12 +31,13 @@ export default function GradingPage() {
   useEffect(() => {
     const run = async () => {
       try {
-        const [{ data: l }, { data: a }] = await Promise.all([
+        const [{ data: l }, res] = await Promise.all([
           axios.get(`${API_URL}/lesson-content/${lessonId}/full`, auth()),
           axios.get(`${API_URL}/attempts/lesson/${lessonId}${showAll ? "?all=1" : ""}`, auth()),
         ]);
         setLesson(l);
-        setAttempts(a);
+        setAttempts(res.data);
+        setCursor(nextCursor(res));
       } catch {
         setError("Не вдалося завантажити (потрібні права вчителя/адміна).");
       }
@@ -40,6 +45,23 @@ export default function GradingPage() {
     run();
   }, [lessonId, showAll]);
 
+  const loadMore = useCallback(async () => {
+    if (!cursor) return;
+    setLoadingMore(true);
+    try {
+      const res = await axios.get(`${API_URL}/attempts/lesson/${lessonId}`, {
+        ...auth(),
+        params: showAll ? { all: 1, cursor } : { cursor },
+      });
+      setAttempts((prev) => [...prev, ...res.data]);
+      setCursor(nextCursor(res));
+    } catch {
+      setError("Не вдалося завантажити (потрібні права вчителя/адміна).");
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [lessonId, showAll, cursor]);
+
   const openAttempt = useCallback(async (id) => {
     setSelected(id);
     const { data } = await axios.get(`${API_URL}/attempts/${id}`, auth());
@@ -88,6 +110,11 @@ export default function GradingPage() {
               {at.overall_grade != null && <span className="gr-grade-badge">{at.overall_grade}</span>}
             </button>
           ))}
+          {cursor && (
+            <button className="gr-more" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? "Завантаження…" : "Показати ще"}
+            </button>
+          )}
           {!attempts.length && <div className="gr-empty">Ще ніхто не проходив.</div>}
         </aside>
 
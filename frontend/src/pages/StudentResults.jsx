@@ -6,6 +6,8 @@ import "../styles/homework.css";
 
 const auth = () => ({ headers: { Authorization: `Bearer ${localStorage.getItem("token")}` } });
 const keyOf = (b, q) => `${b}:${q ?? "null"}`;
+// список спроб віддається сторінками: курсор наступної — у заголовку X-Next-Cursor
+const nextCursor = (res) => res.headers["x-next-cursor"] || null;
 
 function fmtDate(s) {
   if (!s) return "";
@@ -36,6 +38,8 @@ function fmtAnswer(question, ans) {
 
 export default function StudentResults() {
   const [items, setItems] = useState([]);
+  const [cursor, setCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selected, setSelected] = useState(null);
   const [attempt, setAttempt] = useState(null);
   const [lesson, setLesson] = useState(null);
@@ -46,8 +50,9 @@ export default function StudentResults() {
   useEffect(() => {
     (async () => {
       try {
-        const { data } = await axios.get(`${API_URL}/attempts/my`, auth());
-        setItems(data);
+        const res = await axios.get(`${API_URL}/attempts/my`, auth());
+        setItems(res.data);
+        setCursor(nextCursor(res));
       } catch {
         setError("Не вдалося завантажити результати.");
       } finally {
@@ -56,6 +61,20 @@ export default function StudentResults() {
     })();
   }, []);
 
+  const loadMore = useCallback(async () => {
+    if (!cursor) return;
+    setLoadingMore(true);
+    try {
+      const res = await axios.get(`${API_URL}/attempts/my`, { ...auth(), params: { cursor } });
+      setItems((prev) => [...prev, ...res.data]);
+      setCursor(nextCursor(res));
+    } catch {
+      setError("Не вдалося завантажити результати.");
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [cursor]);
+
   const open = useCallback(async (item) => {
     setSelected(item.id);
     setAttempt(null);
@@ -105,6 +124,11 @@ export default function StudentResults() {
               {it.overall_grade != null && <span className="sr-grade-badge">{it.overall_grade}</span>}
             </button>
           ))}
+          {cursor && (
+            <button className="sr-more" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? "Завантаження…" : "Показати ще"}
+            </button>
+          )}
         </aside>
 
         <main className="sr-main">